@@ -0,0 +1,99 @@
+"""
+Benchmark agent construction with and without the prompt registry.
+
+"rebuild" clears the registry before each round, lets LangChain derive the
+tool schemas again and gives every HTTP client its own TLS context, as every
+construction did before; "registry" reuses what the first round built.
+Also reports how much of each agent's request is a prefix shared by every
+call, which the provider can serve from its prompt cache:
+
+    python benchmarks/bench_agent_setup.py --rounds 50
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+from unittest import mock
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+
+import httpx
+from langchain_core.messages import convert_to_openai_messages
+
+from src.agents import prompts
+from src.agents import create_market_agent, create_research_agent, create_resource_agent
+
+AGENTS = ("research", "market", "resource")
+
+
+def clear_registry() -> None:
+    for cached in (prompts.get_prompt, prompts._tool_schemas, prompts.prompt_hash, prompts.prompts_fingerprint):
+        cached.cache_clear()
+
+
+def build_all() -> None:
+    create_research_agent()
+    create_market_agent()
+    create_resource_agent()
+
+
+def time_setup(rounds: int, rebuild: bool) -> float:
+    """Average seconds to build the three agents."""
+    total = 0.0
+    for _ in range(rounds):
+        with contextlib.ExitStack() as stack:
+            if rebuild:
+                clear_registry()
+                # Without precomputed schemas, build_agent derives them from the tools
+                stack.enter_context(mock.patch("src.agents.base.get_tool_schemas", lambda name: None))
+                # Every HTTP client loads the CA bundle again
+                stack.enter_context(mock.patch("src.agents.base._ssl_context", httpx.create_ssl_context))
+            start = time.perf_counter()
+            build_all()
+            total += time.perf_counter() - start
+    return total / rounds
+
+
+def stable_prefix(agent_name: str) -> tuple:
+    """Characters shared by two different requests' payloads, and the payload length."""
+    tools = json.dumps(prompts.get_tool_schemas(agent_name))
+    payloads = []
+    for company in ("Acme Corp", "Globex"):
+        messages = prompts.get_prompt(agent_name).format_messages(
+            input=f"Analyze the company {company} in the retail industry", agent_scratchpad=[]
+        )
+        payloads.append(tools + json.dumps(convert_to_openai_messages(messages)))
+    shared = 0
+    for a, b in zip(*payloads):
+        if a != b:
+            break
+        shared += 1
+    return shared, len(payloads[0])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=20, help="Constructions to average over")
+    args = parser.parse_args()
+
+    build_all()  # warm imports and client setup
+    rebuild = time_setup(args.rounds, rebuild=True)
+    registry = time_setup(args.rounds, rebuild=False)
+    print(f"{'setup':<10} {'ms/round':>9}")
+    print(f"{'rebuild':<10} {rebuild * 1000:>9.2f}")
+    print(f"{'registry':<10} {registry * 1000:>9.2f}")
+    print(f"saved {(rebuild - registry) * 1000:.2f} ms per construction ({1 - registry / rebuild:.0%})")
+
+    for agent_name in AGENTS:
+        shared, total = stable_prefix(agent_name)
+        print(f"{agent_name:<10} prompt {prompts.prompt_hash(agent_name)}: "
+              f"~{shared // 4} of ~{total // 4} tokens are a stable prefix")
+
+
+if __name__ == "__main__":
+    main()
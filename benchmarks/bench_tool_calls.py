@@ -0,0 +1,108 @@
+"""
+Benchmark one agent step that needs three searches, functions agent vs tools agent.
+
+The model and search backend are local stand-ins with fixed latency, so the
+numbers isolate agent round trips rather than provider speed:
+
+    python benchmarks/bench_tool_calls.py --llm-latency 0.8 --search-latency 0.5
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Any, List, Optional
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain.agents import AgentExecutor
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatResult
+from langchain_core.tools import Tool
+
+from src.agents.base import build_agent
+from src.agents.prompts import get_prompt
+
+QUERIES = ["Acme Corp latest news", "Acme Corp competitors", "retail AI technology trends"]
+
+
+class ScriptedChatModel(GenericFakeChatModel):
+    """Replays scripted messages after a fixed delay and counts calls."""
+
+    latency: float = 0.0
+    calls: int = 0
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        self.calls += 1
+        time.sleep(self.latency)
+        return super()._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Optional[AsyncCallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return super()._generate(messages, stop=stop, **kwargs)
+
+
+def functions_script() -> List[AIMessage]:
+    """One function call per turn, then the answer."""
+    turns = [
+        AIMessage(content="", additional_kwargs={
+            "function_call": {"name": "web_search", "arguments": json.dumps({"__arg1": query})}
+        })
+        for query in QUERIES
+    ]
+    return turns + [AIMessage(content="Analysis complete.")]
+
+
+def tools_script() -> List[AIMessage]:
+    """All three tool calls in the first turn, then the answer."""
+    calls = [
+        {"name": "web_search", "args": {"__arg1": query}, "id": f"call_{i}", "type": "tool_call"}
+        for i, query in enumerate(QUERIES)
+    ]
+    return [AIMessage(content="", tool_calls=calls), AIMessage(content="Analysis complete.")]
+
+
+def run(agent_type: str, llm_latency: float, search_latency: float) -> dict:
+    """Run one scripted analysis step and return its iteration count and latency."""
+    script = tools_script() if agent_type == "tools" else functions_script()
+    llm = ScriptedChatModel(messages=iter(script), latency=llm_latency, disable_streaming=True)
+
+    def search(query: str) -> str:
+        time.sleep(search_latency)
+        return f"Results for {query}"
+
+    tools = [Tool(name="web_search", func=search, description="Search the web")]
+    prompt = get_prompt("research")
+    agent = build_agent(llm, tools, prompt, agent_type=agent_type)
+    executor = AgentExecutor(agent=agent, tools=tools, max_iterations=10)
+
+    start = time.perf_counter()
+    asyncio.run(executor.ainvoke({"input": "Analyze Acme Corp in retail"}))
+    return {"agent": agent_type, "llm_calls": llm.calls, "seconds": time.perf_counter() - start}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--llm-latency", type=float, default=0.8, help="Seconds per model call")
+    parser.add_argument("--search-latency", type=float, default=0.5, help="Seconds per search")
+    args = parser.parse_args()
+
+    results = [run(agent_type, args.llm_latency, args.search_latency) for agent_type in ("functions", "tools")]
+    print(f"{'agent':<10} {'llm calls':>9} {'seconds':>8}")
+    for result in results:
+        print(f"{result['agent']:<10} {result['llm_calls']:>9} {result['seconds']:>8.2f}")
+    before, after = results
+    print(f"speedup: {before['seconds'] / after['seconds']:.2f}x, "
+          f"{before['llm_calls'] - after['llm_calls']} fewer model round trips")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Check that a replayed analysis makes no model or search calls.
+
+Runs one analysis against the fake backends with caching on, then runs it
+again in a fresh process with MRS_CACHE_MODE=replay and fails if the second
+run reached either backend:
+
+    python benchmarks/check_replay.py
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+# Add the project root to Python path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from fake_backends import BackendConfig, FakeBackends
+
+
+def analyze(company: str, industry: str) -> None:
+    """Run one analysis in this process; the published result is dropped first so the agents run."""
+    from src.main import MarketResearchSystem
+    from src.utils.store import default_store
+
+    default_store().purge_results(0)
+    result = MarketResearchSystem().analyze_company(company, industry)
+    if result.get("errors"):
+        sys.exit(f"analysis failed: {result['errors']}")
+
+
+def run_phase(backends: FakeBackends, store_path: str, mode: str, company: str, industry: str) -> dict:
+    """Run `analyze` in a child process with the given cache mode and return the backend calls it made."""
+    before = backends.stats.snapshot()
+    env = {
+        **os.environ, **backends.environ(),
+        "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY", "sk-replay"),
+        "MRS_STORE_PATH": store_path,
+        "MRS_CACHE_MODE": mode,
+        # The agents sample at temperature > 0, which is only cached on request
+        "MRS_LLM_CACHE_SAMPLED": "1",
+        "MRS_LOG_LEVEL": "WARNING",
+    }
+    subprocess.run(
+        [sys.executable, __file__, "--analyze", company, industry], env=env, cwd=ROOT, check=True
+    )
+    after = backends.stats.snapshot()
+    return {name: after[name] - before[name] for name in ("chat_calls", "searches")}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--company", default="Acme Corp")
+    parser.add_argument("--industry", default="Retail")
+    parser.add_argument("--analyze", nargs=2, metavar=("COMPANY", "INDUSTRY"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.analyze:
+        analyze(*args.analyze)
+        return
+
+    backends = FakeBackends(BackendConfig(first_token_latency=0.01, tokens_per_second=5000, search_latency=0.01))
+    backends.start()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            store_path = os.path.join(tmp, "replay.sqlite3")
+            recorded = run_phase(backends, store_path, "readwrite", args.company, args.industry)
+            replayed = run_phase(backends, store_path, "replay", args.company, args.industry)
+    finally:
+        backends.shutdown()
+
+    print(f"recorded: {recorded}")
+    print(f"replayed: {replayed}")
+    if any(replayed.values()):
+        sys.exit("replay reached the backends")
+    print("ok: replay made no backend calls")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""
+Local stand-ins for the OpenAI chat API and the web search backend.
+
+Both run in a background thread on 127.0.0.1 and are configured with the
+latency, token rate and error rate to simulate. Point the system at them with
+
+    OPENAI_BASE_URL=http://127.0.0.1:<port>/v1  MRS_SEARCH_URL=http://127.0.0.1:<port>/search
+
+The chat server answers like a tools-capable model: the first turn of an
+agent step requests `searches` web searches in parallel, the turn after the
+tool results returns a final answer of `completion_tokens` tokens. Run it on
+its own to serve a long-lived backend:
+
+    python benchmarks/fake_backends.py --port 8900 --tokens-per-second 80 --error-rate 0.05
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+
+@dataclass
+class BackendConfig:
+    """Behaviour of the fake backends."""
+
+    first_token_latency: float = 0.3  # seconds before the model starts answering
+    tokens_per_second: float = 100.0  # completion tokens generated per second
+    completion_tokens: int = 300  # length of a final answer, capped by the request's max_tokens
+    searches: int = 2  # parallel tool calls requested per agent step
+    search_latency: float = 0.2  # seconds per search
+    error_rate: float = 0.0  # fraction of model calls answered with 429
+    retry_after: float = 0.5  # seconds suggested in the 429 Retry-After header
+
+
+class BackendStats:
+    """Thread-safe counters of what the fake backends served."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts: Dict[str, int] = {
+            "chat_calls": 0, "rate_limited": 0, "prompt_tokens": 0, "completion_tokens": 0, "searches": 0
+        }
+
+    def add(self, **counts: int) -> None:
+        with self._lock:
+            for name, value in counts.items():
+                self.counts[name] += value
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.counts)
+
+
+def _count_tokens(messages: List[dict]) -> int:
+    """Rough prompt size, at four characters per token."""
+    return sum(len(json.dumps(message)) for message in messages) // 4
+
+
+def _requested_searches(body: dict, searches: int) -> List[dict]:
+    """Return the function calls to make this turn; empty once tool results are in."""
+    messages = body.get("messages", [])
+    if messages and messages[-1].get("role") in ("tool", "function"):
+        return []
+    if body.get("tools"):
+        name, count = body["tools"][0]["function"]["name"], searches
+    elif body.get("functions"):
+        # The functions API allows one call per turn
+        name, count = body["functions"][0]["name"], 1
+    else:
+        return []
+    topic = next((m.get("content") for m in reversed(messages) if m.get("role") == "user"), "")
+    return [
+        {"name": name, "arguments": json.dumps({"__arg1": f"{topic} (aspect {i + 1})"})}
+        for i in range(count)
+    ]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "FakeBackends"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+    def _send(self, status: int, payload: str, content_type: str = "application/json",
+              headers: Optional[Dict[str, str]] = None) -> None:
+        data = payload.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        if url.path != "/search":
+            self._send(404, json.dumps({"error": {"message": "not found"}}))
+            return
+        query = parse_qs(url.query).get("q", [""])[0]
+        time.sleep(self.server.config.search_latency)
+        self.server.stats.add(searches=1)
+        lines = [f"Result {i + 1} for {query}: synthetic snippet about {query}." for i in range(5)]
+        self._send(200, "\n".join(lines), content_type="text/plain")
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        if urlparse(self.path).path != "/v1/chat/completions":
+            self._send(404, json.dumps({"error": {"message": "not found"}}))
+            return
+        config = self.server.config
+        if self.server.random() < config.error_rate:
+            self.server.stats.add(rate_limited=1)
+            self._send(429, json.dumps({"error": {
+                "message": "Rate limit reached (injected)", "type": "requests", "code": "rate_limit_exceeded"
+            }}), headers={"Retry-After": str(config.retry_after)})
+            return
+
+        prompt_tokens = _count_tokens(body.get("messages", []))
+        calls = _requested_searches(body, config.searches)
+        message: dict = {"role": "assistant", "content": None}
+        if calls and body.get("tools"):
+            message["tool_calls"] = [
+                {"index": i, "id": f"call_{uuid.uuid4().hex[:12]}", "type": "function", "function": call}
+                for i, call in enumerate(calls)
+            ]
+            completion_tokens, finish_reason = 20 * len(calls), "tool_calls"
+        elif calls:
+            message["function_call"] = calls[0]
+            completion_tokens, finish_reason = 20, "function_call"
+        else:
+            limit = body.get("max_tokens") or body.get("max_completion_tokens") or config.completion_tokens
+            completion_tokens = min(config.completion_tokens, limit)
+            finish_reason = "length" if completion_tokens < config.completion_tokens else "stop"
+            message["content"] = " ".join(["insight"] * completion_tokens)
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        }
+        self.server.stats.add(chat_calls=1, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+
+        completion = {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+        }
+        time.sleep(config.first_token_latency)
+        if body.get("stream"):
+            self._stream(completion, message, finish_reason, usage, body)
+            return
+        time.sleep(completion_tokens / config.tokens_per_second)
+        for call in message.get("tool_calls", []):
+            call.pop("index")
+        self._send(200, json.dumps({
+            **completion,
+            "object": "chat.completion",
+            "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+            "usage": usage
+        }))
+
+    def _stream(self, completion: dict, message: dict, finish_reason: str, usage: dict, body: dict) -> None:
+        """Send the completion as server-sent events, pacing content at the configured token rate."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def event(delta: Optional[dict], finish: Optional[str] = None, **extra) -> None:
+            choices = [] if delta is None else [{"index": 0, "delta": delta, "finish_reason": finish}]
+            chunk = {**completion, "object": "chat.completion.chunk", "choices": choices, **extra}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        event({"role": "assistant", "content": ""})
+        words = (message["content"] or "").split(" ") if message["content"] else []
+        step = 20
+        for start in range(0, len(words), step):
+            time.sleep(len(words[start:start + step]) / self.server.config.tokens_per_second)
+            event({"content": " ".join(words[start:start + step]) + (" " if start + step < len(words) else "")})
+        if message.get("tool_calls"):
+            time.sleep(usage["completion_tokens"] / self.server.config.tokens_per_second)
+            event({"tool_calls": message["tool_calls"]})
+        if message.get("function_call"):
+            time.sleep(usage["completion_tokens"] / self.server.config.tokens_per_second)
+            event({"function_call": message["function_call"]})
+        event({}, finish_reason)
+        if (body.get("stream_options") or {}).get("include_usage"):
+            event(None, usage=usage)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+class FakeBackends(ThreadingHTTPServer):
+    """Serves the fake chat completions and search endpoints from a background thread."""
+
+    daemon_threads = True
+
+    def __init__(self, config: Optional[BackendConfig] = None, port: int = 0, seed: Optional[int] = None):
+        """
+        Args:
+            config: Latency, token rate and error injection settings
+            port: Port to listen on; 0 picks a free one
+            seed: Seed for the 429 injection, for repeatable runs
+        """
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.config = config or BackendConfig()
+        self.stats = BackendStats()
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def random(self) -> float:
+        with self._rng_lock:
+            return self._rng.random()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self) -> "FakeBackends":
+        self._thread = threading.Thread(target=self.serve_forever, name="fake-backends", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def environ(self) -> Dict[str, str]:
+        """Environment variables that point the system at these backends."""
+        return {
+            "OPENAI_BASE_URL": f"{self.base_url}/v1",
+            "OPENAI_API_KEY": "sk-fake",
+            "MRS_SEARCH_URL": f"{self.base_url}/search",
+        }
+
+
+def add_backend_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the BackendConfig options to a command line parser."""
+    defaults = BackendConfig()
+    group = parser.add_argument_group("fake backends")
+    group.add_argument("--first-token-latency", type=float, default=defaults.first_token_latency)
+    group.add_argument("--tokens-per-second", type=float, default=defaults.tokens_per_second)
+    group.add_argument("--completion-tokens", type=int, default=defaults.completion_tokens)
+    group.add_argument("--searches", type=int, default=defaults.searches, help="Parallel searches per agent step")
+    group.add_argument("--search-latency", type=float, default=defaults.search_latency)
+    group.add_argument("--error-rate", type=float, default=defaults.error_rate, help="Fraction of model calls given a 429")
+    group.add_argument("--retry-after", type=float, default=defaults.retry_after)
+
+
+def backend_config(args: argparse.Namespace) -> BackendConfig:
+    """Build a BackendConfig from parsed `add_backend_arguments` options."""
+    return BackendConfig(**{name: getattr(args, name) for name in asdict(BackendConfig())})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--seed", type=int, default=None)
+    add_backend_arguments(parser)
+    args = parser.parse_args()
+
+    server = FakeBackends(backend_config(args), port=args.port, seed=args.seed)
+    print(" ".join(f"{name}={value}" for name, value in server.environ().items()))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(json.dumps(server.stats.snapshot()))
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,423 @@
+"""
+Load test the Market Research System against local fake model and search backends.
+
+Virtual users call one entry point (the in-process system, the worker pool,
+or the Streamlit app through AppTest) with a closed-loop, Poisson or burst
+arrival pattern. The report covers throughput, p50/p95/p99 latency, errors
+by kind, and memory and agent chat history sampled over the run, so growth
+that would leak in production shows up here first:
+
+    python benchmarks/loadtest.py --users 8 --duration 60
+    python benchmarks/loadtest.py --pattern poisson --rate 2 --duration 120 --tracemalloc
+    python benchmarks/loadtest.py --target pool --workers 4 --sweep 1,2,4,8,16 --output sweep.json
+
+Model calls are not cached during a load test and every request uses a new
+company unless `--companies` is set, so coalescing and the result cache do
+not hide the work. The shared request budget (MRS_RATE_LIMIT_RPS) and the
+scheduler limits (MRS_MAX_CONCURRENT_ANALYSES) apply as configured.
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Set
+
+# Add the project root to Python path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from fake_backends import FakeBackends, add_backend_arguments, backend_config
+
+# Agent outputs that mean a step failed even though analyze_company returned
+DEGRADED_MARKERS = ("Error code:", "Rate limit", "Request timed out", "Connection error", "Agent stopped due to")
+
+
+@dataclass
+class Sample:
+    """One request as seen by a virtual user."""
+
+    started: float  # seconds since the start of the run
+    latency: float
+    outcome: str  # "ok", "degraded", or the exception class name
+
+
+@dataclass
+class Probe:
+    """Process state sampled while the load runs."""
+
+    elapsed: float
+    in_flight: int
+    completed: int
+    rss_mb: float
+    traced_mb: Optional[float]
+    chat_history: int
+
+
+def _rss_mb(pid: int) -> float:
+    """Resident set size of a process in MiB, read from /proc (0 where unavailable)."""
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+def _degraded(result: dict) -> bool:
+    return any(marker in str(value) for value in result.values() for marker in DEGRADED_MARKERS)
+
+
+class StepErrors(logging.Handler):
+    """
+    Remembers the runs whose agent steps logged an error.
+
+    Agents return a failed step's error text as their answer, so a run that
+    lost a step still completes; this catches it for in-process targets.
+    """
+
+    def __init__(self):
+        super().__init__(logging.ERROR)
+        self.run_ids: Set[str] = set()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        from src.utils.log import current_run_id
+        run_id = current_run_id()
+        if run_id:
+            self.run_ids.add(run_id)
+
+
+class SystemTarget:
+    """Calls `MarketResearchSystem.analyze_company` in this process."""
+
+    name = "system"
+
+    def __init__(self, args: argparse.Namespace):
+        from src.main import MarketResearchSystem
+        self.system = MarketResearchSystem()
+
+    def call(self, company: str, industry: str) -> dict:
+        return self.system.analyze_company(company, industry)
+
+    def chat_history(self) -> int:
+        """Messages held in the agents' conversation memory."""
+        total = 0
+        for executor in (self.system.research_agent, self.system.market_agent, self.system.resource_agent):
+            memory = getattr(executor, "memory", None)
+            if memory is not None:
+                total += len(memory.chat_memory.messages)
+        return total
+
+    def close(self) -> None:
+        pass
+
+
+class PoolTarget(SystemTarget):
+    """Calls `WorkerPool.analyze_company`; memory includes the worker processes."""
+
+    name = "pool"
+
+    def __init__(self, args: argparse.Namespace):
+        from src.serving import WorkerPool
+        self.system = WorkerPool(args.workers)
+
+    def chat_history(self) -> int:
+        # Agent memory lives in the workers, whose RSS is sampled instead
+        return 0
+
+    def close(self) -> None:
+        self.system.shutdown()
+
+
+class UITarget:
+    """Submits the Streamlit form through AppTest, one fresh session per request."""
+
+    name = "ui"
+
+    def __init__(self, args: argparse.Namespace):
+        from streamlit.testing.v1 import AppTest
+        self.app_test = AppTest
+        self.script = os.path.join(ROOT, "streamlit_app.py")
+        self.timeout = args.request_timeout
+
+    def call(self, company: str, industry: str) -> dict:
+        at = self.app_test.from_file(self.script, default_timeout=self.timeout).run()
+        at.text_input[0].input(company)
+        at.text_input[1].input(industry)
+        at.button[0].click().run()
+        if at.exception:
+            raise RuntimeError(at.exception[0].message)
+        if at.error:
+            raise RuntimeError(at.error[0].value)
+        if at.warning:
+            raise RuntimeError(at.warning[0].value)
+        return {f"section_{i}": markdown.value for i, markdown in enumerate(at.markdown)}
+
+    def chat_history(self) -> int:
+        # The system is cached inside the app's script runner, out of reach here
+        return 0
+
+    def close(self) -> None:
+        pass
+
+
+TARGETS = {"system": SystemTarget, "pool": PoolTarget, "ui": UITarget}
+
+
+class LoadRun:
+    """Drives one target with one arrival pattern and collects samples."""
+
+    # Shared by every level of a sweep so later levels do not reuse earlier companies
+    _ids = itertools.count()
+
+    def __init__(self, target, args: argparse.Namespace, users: int, step_errors: StepErrors):
+        self.target = target
+        self.step_errors = step_errors
+        self.args = args
+        self.users = users
+        self.samples: List[Sample] = []
+        self.probes: List[Probe] = []
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._stop = threading.Event()
+        self._start = 0.0
+
+    def _company(self) -> str:
+        n = next(self._ids)
+        if self.args.companies:
+            n %= self.args.companies
+        return f"{self.args.company_prefix} {n}"
+
+    def _request(self, arrived: float) -> None:
+        """Issue one request; latency counts from its arrival, including any client-side queueing."""
+        with self._lock:
+            self._in_flight += 1
+        from src.utils.log import log_context
+        outcome = "ok"
+        try:
+            with log_context() as run_id:
+                result = self.target.call(self._company(), self.args.industry)
+            if _degraded(result) or run_id in self.step_errors.run_ids:
+                outcome = "degraded"
+        except Exception as e:
+            outcome = type(e).__name__
+        finally:
+            finished = time.monotonic()
+            with self._lock:
+                self._in_flight -= 1
+                self.samples.append(Sample(arrived - self._start, finished - arrived, outcome))
+
+    def _closed_user(self) -> None:
+        while not self._stop.is_set():
+            self._request(time.monotonic())
+            self._stop.wait(random.expovariate(1 / self.args.think_time) if self.args.think_time else 0)
+
+    def _sample(self) -> None:
+        children = [process.pid for process in multiprocessing.active_children()]
+        with self._lock:
+            in_flight, completed = self._in_flight, len(self.samples)
+        traced = tracemalloc.get_traced_memory()[0] / 2 ** 20 if tracemalloc.is_tracing() else None
+        self.probes.append(Probe(
+            elapsed=time.monotonic() - self._start,
+            in_flight=in_flight,
+            completed=completed,
+            rss_mb=_rss_mb(os.getpid()) + sum(_rss_mb(pid) for pid in children),
+            traced_mb=traced,
+            chat_history=self.target.chat_history()
+        ))
+
+    def run(self) -> None:
+        """Generate load for `--duration` seconds, then wait for in-flight requests."""
+        args = self.args
+        self._start = time.monotonic()
+        deadline = self._start + args.duration
+        # Open-loop patterns never wait on the system, so arrivals queue here if it falls behind
+        executor = ThreadPoolExecutor(max_workers=args.max_in_flight, thread_name_prefix="vuser")
+        users = []
+        if args.pattern == "closed":
+            users = [threading.Thread(target=self._closed_user, daemon=True) for _ in range(self.users)]
+            for user in users:
+                user.start()
+
+        next_arrival = self._start
+        next_probe = self._start
+        while time.monotonic() < deadline:
+            now = time.monotonic()
+            if now >= next_probe:
+                self._sample()
+                next_probe += args.sample_interval
+            if args.pattern != "closed" and now >= next_arrival:
+                batch = self.users if args.pattern == "burst" else 1
+                for _ in range(batch):
+                    executor.submit(self._request, next_arrival)
+                gap = args.burst_interval if args.pattern == "burst" else random.expovariate(args.rate)
+                next_arrival += gap
+            time.sleep(min(0.05, max(0.0, min(next_probe, next_arrival) - time.monotonic())))
+
+        self._stop.set()
+        for user in users:
+            user.join()
+        executor.shutdown(wait=True)
+        self._sample()
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _slope(points: List[tuple]) -> float:
+    """Least-squares slope of (x, y) points."""
+    if len(points) < 2:
+        return 0.0
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    spread = sum((x - mean_x) ** 2 for x, _ in points)
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / spread if spread else 0.0
+
+
+def summarize(run: LoadRun, duration: float, backend_stats: Dict[str, int]) -> dict:
+    """Reduce a run's samples and probes to the report."""
+    samples = run.samples
+    latencies = [s.latency for s in samples if s.outcome == "ok"]
+    errors: Dict[str, int] = {}
+    for sample in samples:
+        if sample.outcome != "ok":
+            errors[sample.outcome] = errors.get(sample.outcome, 0) + 1
+    # Skip the first quarter so start-up allocation is not mistaken for growth
+    steady = run.probes[len(run.probes) // 4:]
+    return {
+        "target": run.target.name,
+        "pattern": run.args.pattern,
+        "users": run.users,
+        "rate": run.args.rate,
+        "burst_interval": run.args.burst_interval,
+        "requests": len(samples),
+        "throughput_rps": len(latencies) / duration,
+        "error_rate": (len(samples) - len(latencies)) / len(samples) if samples else 0.0,
+        "errors": errors,
+        "latency_p50": _percentile(latencies, 0.50),
+        "latency_p95": _percentile(latencies, 0.95),
+        "latency_p99": _percentile(latencies, 0.99),
+        "rss_start_mb": run.probes[0].rss_mb if run.probes else 0.0,
+        "rss_end_mb": run.probes[-1].rss_mb if run.probes else 0.0,
+        "rss_growth_mb_per_min": 60 * _slope([(p.elapsed, p.rss_mb) for p in steady]),
+        "chat_history_per_request": _slope([(p.completed, p.chat_history) for p in steady]),
+        "backend": backend_stats,
+        "timeline": [asdict(probe) for probe in run.probes],
+    }
+
+
+def find_knee(reports: List[dict], min_gain: float = 0.1) -> Optional[dict]:
+    """
+    Return the last concurrency level that still paid off.
+
+    The knee is where adding users stops raising throughput by at least
+    `min_gain`, or where p95 latency more than doubles.
+    """
+    for previous, current in zip(reports, reports[1:]):
+        gain = current["throughput_rps"] / previous["throughput_rps"] - 1 if previous["throughput_rps"] else 0
+        if gain < min_gain or current["latency_p95"] > 2 * max(previous["latency_p95"], 1e-9):
+            return previous
+    return reports[-1] if reports else None
+
+
+def print_report(report: dict) -> None:
+    load = {
+        "closed": f"users={report['users']}",
+        "poisson": f"rate={report['rate']}/s",
+        "burst": f"burst={report['users']}/{report['burst_interval']}s",
+    }[report["pattern"]]
+    print(
+        f"{report['target']}/{report['pattern']} {load:<10} "
+        f"reqs={report['requests']:<5} thr={report['throughput_rps']:.2f}/s "
+        f"p50={report['latency_p50']:.2f}s p95={report['latency_p95']:.2f}s p99={report['latency_p99']:.2f}s "
+        f"err={report['error_rate']:.1%} rss={report['rss_start_mb']:.0f}->{report['rss_end_mb']:.0f}MiB "
+        f"({report['rss_growth_mb_per_min']:+.1f}MiB/min)"
+    )
+    if report["errors"]:
+        print(f"  errors: {report['errors']}")
+    if report["chat_history_per_request"] > 0.5:
+        print(f"  warning: agent chat history grows by {report['chat_history_per_request']:.1f} "
+              "messages per request and is never trimmed")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", choices=sorted(TARGETS), default="system")
+    parser.add_argument("--pattern", choices=["closed", "poisson", "burst"], default="closed")
+    parser.add_argument("--users", type=int, default=4, help="Concurrent users (closed) or burst size (burst)")
+    parser.add_argument("--rate", type=float, default=1.0, help="Mean arrivals per second (poisson)")
+    parser.add_argument("--burst-interval", type=float, default=10.0, help="Seconds between bursts (burst)")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Mean pause between a user's requests (closed)")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to generate load per level")
+    parser.add_argument("--sweep", type=str, default=None, help="Comma-separated user counts to find the knee")
+    parser.add_argument("--max-in-flight", type=int, default=256, help="Client-side cap on open-loop requests")
+    parser.add_argument("--companies", type=int, default=0, help="Distinct companies to cycle through; 0 is all distinct")
+    parser.add_argument("--company-prefix", type=str, default="LoadCo")
+    parser.add_argument("--industry", type=str, default="Retail")
+    parser.add_argument("--workers", type=int, default=2, help="Worker processes (pool target)")
+    parser.add_argument("--request-timeout", type=float, default=300.0, help="Seconds before a UI request fails")
+    parser.add_argument("--sample-interval", type=float, default=1.0, help="Seconds between memory samples")
+    parser.add_argument("--tracemalloc", action="store_true", help="Also track Python heap allocations (slower)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=str, default=None, help="Write the full report, with timelines, as JSON")
+    add_backend_arguments(parser)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    backends = FakeBackends(backend_config(args), seed=args.seed).start()
+    # Configuration is read at import, so the environment must be set before src is loaded
+    os.environ.update(backends.environ())
+    os.environ["MRS_CACHE_MODE"] = "off"
+    os.environ.setdefault("MRS_LOG_LEVEL", "WARNING")
+    os.environ["MRS_STORE_PATH"] = os.path.join(tempfile.mkdtemp(prefix="loadtest-"), "store.sqlite3")
+    if args.tracemalloc:
+        tracemalloc.start()
+
+    from src.utils.log import configure_logging
+    configure_logging(level=os.environ["MRS_LOG_LEVEL"])
+    step_errors = StepErrors()
+    logging.getLogger("src.agents").addHandler(step_errors)
+
+    levels = [int(n) for n in args.sweep.split(",")] if args.sweep else [args.users]
+    target = TARGETS[args.target](args)
+    reports = []
+    try:
+        for users in levels:
+            before = backends.stats.snapshot()
+            run = LoadRun(target, args, users, step_errors)
+            started = time.monotonic()
+            run.run()
+            after = backends.stats.snapshot()
+            report = summarize(run, time.monotonic() - started, {k: after[k] - before[k] for k in after})
+            print_report(report)
+            reports.append(report)
+    finally:
+        target.close()
+        backends.stop()
+
+    knee = find_knee(reports) if len(reports) > 1 else None
+    if knee:
+        print(f"knee: {knee['users']} users ({knee['throughput_rps']:.2f}/s, p95 {knee['latency_p95']:.2f}s)")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"levels": reports, "knee_users": knee["users"] if knee else None}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
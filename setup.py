@@ -13,6 +13,9 @@ setup(
         "streamlit",
         "python-dotenv",
     ],
+    extras_require={
+        "export": ["pyarrow"],
+    },
     author="Your Name",
     author_email="your.email@example.com",
     description="A multi-agent system for market research and AI/ML use case generation",
@@ -17,6 +17,7 @@ from .agents.research_agent import ResearchAgent
 from .agents.market_agent import MarketAgent
 from .agents.resource_agent import ResourceAgent
 from .utils.web_search import WebSearchTool
+from .utils.cancellation import AnalysisCancelled, CancelToken
 
 __version__ = "0.1.0"
 
@@ -33,5 +34,7 @@ __all__ = [
 	'ResearchAgent',
 	'MarketAgent',
 	'ResourceAgent',
-	'WebSearchTool'
+	'WebSearchTool',
+	'AnalysisCancelled',
+	'CancelToken'
 ]
\ No newline at end of file
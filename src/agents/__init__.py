@@ -5,6 +5,7 @@ Agent implementations for the Market Research System.
 from .research_agent import create_research_agent, ResearchAgent
 from .market_agent import create_market_agent, MarketAgent
 from .resource_agent import create_resource_agent, ResourceAgent
+from .prompts import get_prompt, prompt_hash
 
 __all__ = [
 	'create_research_agent',
@@ -13,4 +14,6 @@ __all__ = [
 	'ResearchAgent',
 	'MarketAgent',
 	'ResourceAgent',
+	'get_prompt',
+	'prompt_hash',
 ]
\ No newline at end of file
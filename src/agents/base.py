@@ -1,16 +1,239 @@
-from typing import Tuple
+import logging
+import os
+import ssl
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+import httpx
+from openai import DefaultAsyncHttpxClient, DefaultHttpxClient
 from langchain_openai import ChatOpenAI
 from langchain_core.tools import Tool
 from langchain.agents import AgentExecutor
-from langchain.agents import create_openai_functions_agent
-from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_community.utilities import DuckDuckGoSearchAPIWrapper
+from langchain.agents import create_openai_functions_agent, create_openai_tools_agent
+from langchain.agents.format_scratchpad import format_to_openai_function_messages
+from langchain.agents.format_scratchpad.openai_tools import format_to_openai_tool_messages
+from langchain.agents.output_parsers import OpenAIFunctionsAgentOutputParser
+from langchain.agents.output_parsers.openai_tools import OpenAIToolsAgentOutputParser
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.runnables import ConfigurableField, Runnable, RunnablePassthrough
+from langchain_core.prompts import ChatPromptTemplate
 from langchain.memory import ConversationBufferMemory
-from ..config.constants import *
+from ..config.constants import (
+    AGENT_TYPE,
+    DEFAULT_TEMPERATURE,
+    MAX_ITERATIONS,
+    MAX_TOKENS,
+    MODEL_NAME,
+    REQUEST_TIMEOUT,
+    VERBOSE
+)
+from ..utils.adaptive_limits import RunTelemetryHandler, default_limits
+from ..utils.cancellation import AnalysisCancelled, CancelToken, invoke_with_cancellation
+from ..utils.llm_cache import build_llm_cache
+from ..utils.log import agent_log_callbacks
+from ..utils.rate_limit import SharedRateLimiter
+from ..utils.web_search import WebSearchTool
+from .prompts import get_prompt, get_spec, get_tool_schemas
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def _ssl_context() -> ssl.SSLContext:
+    """Load the CA bundle once per process instead of once per HTTP client."""
+    return httpx.create_ssl_context()
+
+
+def build_llm(agent_name: str) -> Runnable:
+    """
+    Create the chat model for an agent, sharing the global request budget and call cache.
+    
+    `max_tokens` can be overridden per call with `{"configurable": {"max_tokens": n}}`.
+    Streaming calls bypass the model-call cache, so a model with a cache
+    attached makes plain calls instead.
+    """
+    cache = build_llm_cache(agent_name, DEFAULT_TEMPERATURE)
+    return ChatOpenAI(
+        model_name=MODEL_NAME,
+        temperature=DEFAULT_TEMPERATURE,
+        max_tokens=MAX_TOKENS,
+        request_timeout=REQUEST_TIMEOUT,
+        stream_usage=True,
+        rate_limiter=SharedRateLimiter(),
+        cache=cache,
+        disable_streaming=cache is not None,
+        http_client=DefaultHttpxClient(verify=_ssl_context()),
+        http_async_client=DefaultAsyncHttpxClient(verify=_ssl_context())
+    ).configurable_fields(
+        max_tokens=ConfigurableField(id="max_tokens", name="Max tokens", description="Completion token limit")
+    )
+
+
+def build_agent(llm: Runnable, tools: list[Tool], prompt: ChatPromptTemplate,
+                agent_type: str = AGENT_TYPE, tool_schemas: Optional[List[dict]] = None) -> Runnable:
+    """
+    Create the agent runnable for `agent_type` ("tools" or "functions").
+    
+    The tools agent may request several tool calls in one turn; the executor
+    runs them concurrently and returns every observation in the next turn.
+    
+    Args:
+        llm: Chat model the agent calls
+        tools: Tools the executor runs
+        prompt: Agent prompt with an `agent_scratchpad` placeholder
+        agent_type: "tools" or "functions"
+        tool_schemas: Precomputed OpenAI tool schemas for `tools`, e.g. from
+            `get_tool_schemas`; derived from `tools` when omitted
+    """
+    if tool_schemas is None:
+        if agent_type == "functions":
+            return create_openai_functions_agent(llm=llm, tools=tools, prompt=prompt)
+        return create_openai_tools_agent(llm=llm, tools=tools, prompt=prompt)
+    
+    if agent_type == "functions":
+        return (
+            RunnablePassthrough.assign(
+                agent_scratchpad=lambda x: format_to_openai_function_messages(x["intermediate_steps"])
+            )
+            | prompt
+            | llm.bind(functions=[schema["function"] for schema in tool_schemas])
+            | OpenAIFunctionsAgentOutputParser()
+        )
+    return (
+        RunnablePassthrough.assign(
+            agent_scratchpad=lambda x: format_to_openai_tool_messages(x["intermediate_steps"])
+        )
+        | prompt
+        | llm.bind(tools=tool_schemas)
+        | OpenAIToolsAgentOutputParser()
+    )
+
+
+def invoke_agent(executor: AgentExecutor, agent_name: str, inputs: Dict[str, Any], token: CancelToken,
+                 industry: Optional[str] = None,
+                 callbacks: Optional[List[BaseCallbackHandler]] = None) -> Dict[str, Any]:
+    """
+    Run an agent under the iteration and token limits learned for it, and record how the run went.
+    
+    Args:
+        executor: The agent's executor; it is not modified
+        agent_name: Name the limits and telemetry are kept under
+        inputs: Executor inputs
+        token: Cancellation token for the run
+        industry: Industry of the analysis, so limits can differ per industry
+        callbacks: Additional callback handlers for the run
+    
+    Returns:
+        The executor's output dict
+    
+    Raises:
+        AnalysisCancelled: If the token is cancelled before the run finishes
+    """
+    adaptive = default_limits()
+    limits = adaptive.limits(agent_name, industry)
+    # AgentExecutor only passes callbacks on to the agent, so the token limit
+    # is bound to a per-run copy of the agent's runnable
+    agent = executor.agent
+    if hasattr(agent, "runnable"):
+        agent = agent.model_copy(update={
+            "runnable": agent.runnable.with_config(configurable={"max_tokens": limits.max_tokens})
+        })
+    executor = executor.model_copy(update={"agent": agent, "max_iterations": limits.max_iterations})
+    telemetry = RunTelemetryHandler()
+    response = invoke_with_cancellation(executor, inputs, token, callbacks=[telemetry, *(callbacks or [])])
+    output = response.get("output", "") if isinstance(response, dict) else str(response)
+    try:
+        adaptive.record(agent_name, industry, telemetry, limits, str(output))
+    except Exception as e:
+        logger.warning("Could not record %s agent run: %s", agent_name, e)
+    return response
+
+
+def build_search_tool(description: str) -> Tool:
+    """Create the web_search tool backed by the shared search cache."""
+    search = WebSearchTool()
+    return Tool(
+        name="web_search",
+        func=search.run,
+        description=description
+    )
+
+
+def build_memory() -> ConversationBufferMemory:
+    """Create the conversation memory of one agent executor."""
+    return ConversationBufferMemory(
+        return_messages=True,
+        memory_key="chat_history",
+        output_key="output"
+    )
+
+
+def build_executor(agent_name: str, llm: Runnable, tools: list[Tool], prompt: ChatPromptTemplate,
+                   memory: ConversationBufferMemory) -> AgentExecutor:
+    """Create the executor of the agent registered as `agent_name`, using its precomputed tool schemas."""
+    agent = build_agent(llm, tools, prompt, tool_schemas=get_tool_schemas(agent_name))
+    return AgentExecutor.from_agent_and_tools(
+        agent=agent,
+        tools=tools,
+        memory=memory,
+        verbose=VERBOSE,
+        max_iterations=MAX_ITERATIONS,
+        handle_parsing_errors=True
+    )
+
+
+def create_agent(agent_name: str) -> AgentExecutor:
+    """
+    Create the executor of a registered agent with the web search tool.
+    
+    Args:
+        agent_name: Name the agent's prompt is registered under, e.g. "research"
+    
+    Raises:
+        ValueError: If OPENAI_API_KEY is not set
+    """
+    if not os.getenv("OPENAI_API_KEY"):
+        raise ValueError("OPENAI_API_KEY environment variable is not set")
+    
+    tools = [build_search_tool(get_spec(agent_name).search_description)]
+    return build_executor(agent_name, build_llm(agent_name), tools, get_prompt(agent_name), build_memory())
+
+
+def get_agent_response(agent: AgentExecutor, agent_name: str, prompt: str,
+                       cancel_token: Optional[CancelToken] = None, industry: Optional[str] = None,
+                       raise_errors: bool = False) -> str:
+    """
+    Get response from agent without cost tracking.
+    
+    Failures are returned as the error message unless `raise_errors` is set.
+    
+    Args:
+        agent: The agent's executor
+        agent_name: Name the agent's limits and telemetry are kept under
+        prompt: Input for the agent
+        cancel_token: Cancellation token for the run
+        industry: Industry of the analysis
+        raise_errors: Re-raise failures instead of returning them
+    """
+    try:
+        response = invoke_agent(
+            agent, agent_name, {"input": prompt}, cancel_token or CancelToken(),
+            industry=industry, callbacks=agent_log_callbacks(logger)
+        )
+        return response["output"] if isinstance(response, dict) else str(response)
+    except AnalysisCancelled:
+        raise
+    except Exception as e:
+        logger.error("Error getting %s agent response: %s", agent_name, e)
+        if raise_errors:
+            raise
+        return str(e)
+
 
 class BaseAgent:
     """Base class for all agents in the system."""
     
+    name = "base"
+    
     def __init__(self):
         """Initialize base agent with common components."""
         self.llm = self._init_llm()
@@ -18,66 +241,27 @@ class BaseAgent:
         self.memory = self._setup_memory()
         self.agent_executor = self._create_agent()
     
-    def _init_llm(self) -> ChatOpenAI:
+    def _init_llm(self) -> Runnable:
         """Initialize the language model."""
-        return ChatOpenAI(
-            model_name=MODEL_NAME,
-            temperature=DEFAULT_TEMPERATURE,
-            max_tokens=MAX_TOKENS
-        )
+        return build_llm(self.name)
     
     def _setup_tools(self) -> list[Tool]:
         """Setup agent tools. Override in specialized agents."""
-        search = DuckDuckGoSearchAPIWrapper()
-        return [
-            Tool(
-                name="web_search",
-                func=search.run,
-                description="Search the web for information"
-            )
-        ]
+        return [build_search_tool(get_spec(self.name).search_description)]
     
     def _setup_memory(self) -> ConversationBufferMemory:
         """Setup conversation memory."""
-        return ConversationBufferMemory(
-            return_messages=True,
-            memory_key="chat_history",
-            output_key="output"
-        )
+        return build_memory()
     
     def _create_agent(self) -> AgentExecutor:
         """Create the agent executor."""
-        prompt = self._get_prompt_template()
-        agent = create_openai_functions_agent(
-            llm=self.llm,
-            tools=self.tools,
-            prompt=prompt
-        )
-        
-        return AgentExecutor.from_agent_and_tools(
-            agent=agent,
-            tools=self.tools,
-            memory=self.memory,
-            verbose=VERBOSE,
-            max_iterations=MAX_ITERATIONS,
-            handle_parsing_errors=True
-        )
+        return build_executor(self.name, self.llm, self.tools, self._get_prompt_template(), self.memory)
     
     def _get_prompt_template(self) -> ChatPromptTemplate:
-        """Get the prompt template. Override in specialized agents."""
-        return ChatPromptTemplate.from_messages([
-            ("system", "You are an AI assistant."),
-            MessagesPlaceholder(variable_name="chat_history", optional=True),
-            ("human", "{input}"),
-            MessagesPlaceholder(variable_name="agent_scratchpad")
-        ])
-    
-    def get_response(self, prompt: str) -> str:
+        """Get the prompt template registered under the agent's name."""
+        return get_prompt(self.name)
+    
+    def get_response(self, prompt: str, cancel_token: Optional[CancelToken] = None,
+                     industry: Optional[str] = None) -> str:
         """Get response from agent without cost tracking."""
-        try:
-            response = self.agent_executor.invoke({"input": prompt})
-            return response["output"] if isinstance(response, dict) else str(response)
-        except Exception as e:
-            error_msg = f"Error getting response: {e}"
-            print(error_msg)
-            return error_msg 
\ No newline at end of file
+        return get_agent_response(self.agent_executor, self.name, prompt, cancel_token, industry) 
\ No newline at end of file
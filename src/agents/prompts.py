@@ -0,0 +1,134 @@
+"""Versioned prompt and tool-schema registry shared by all agents."""
+
+import hashlib
+import json
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List
+
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.tools import Tool
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+SEARCH_INSTRUCTIONS = (
+    "To search for information, use the web_search tool. "
+    "When you need several independent searches, request them all in the same step."
+)
+
+
+@dataclass(frozen=True)
+class PromptSpec:
+    """System prompt and tool description for one agent, under a version."""
+
+    name: str
+    version: int
+    system: str
+    search_description: str
+
+
+PROMPTS: Dict[str, PromptSpec] = {spec.name: spec for spec in (
+    PromptSpec(
+        name="base",
+        version=1,
+        system="You are an AI assistant.",
+        search_description="Search the web for information"
+    ),
+    PromptSpec(
+        name="research",
+        version=1,
+        system=(
+            "You are an expert research analyst specializing in AI/ML technologies.\n"
+            "Your task is to analyze companies and industries thoroughly, identify current offerings and capabilities, "
+            "evaluate technological maturity and readiness, and highlight key opportunities and challenges.\n\n"
+            f"{SEARCH_INSTRUCTIONS}"
+        ),
+        search_description="Search the web for information about companies and industries"
+    ),
+    PromptSpec(
+        name="market",
+        version=1,
+        system=(
+            "You are an expert in AI/ML solutions and market analysis.\n"
+            "Your task is to analyze industry trends for AI/ML adoption, generate relevant use cases based on "
+            "company/industry needs, prioritize use cases based on impact and feasibility, and consider "
+            "implementation complexity.\n\n"
+            f"{SEARCH_INSTRUCTIONS}"
+        ),
+        search_description="Search for AI/ML use cases and market trends"
+    ),
+    PromptSpec(
+        name="resource",
+        version=1,
+        system=(
+            "You are an expert in finding and evaluating AI/ML implementation resources.\n"
+            "Your task is to find relevant tutorials, documentation, and example implementations, evaluate "
+            "resource quality and applicability, provide clear implementation guidance, and include links to "
+            "GitHub repositories, documentation, and tutorials.\n\n"
+            f"{SEARCH_INSTRUCTIONS}"
+        ),
+        search_description="Search for AI/ML implementation resources, tutorials, and documentation"
+    ),
+)}
+
+
+def get_spec(agent_name: str) -> PromptSpec:
+    """
+    Look up an agent's prompt spec.
+
+    Raises:
+        KeyError: If no prompt is registered under `agent_name`
+    """
+    try:
+        return PROMPTS[agent_name]
+    except KeyError:
+        raise KeyError(f"No prompt registered for agent '{agent_name}'") from None
+
+
+@lru_cache(maxsize=None)
+def get_prompt(agent_name: str) -> ChatPromptTemplate:
+    """
+    Return the agent's chat prompt, built once per process.
+
+    The system message comes first and never contains request data, so every
+    call to an agent starts with the same token prefix and can be served from
+    the provider's prompt cache; history and the request follow it.
+    """
+    return ChatPromptTemplate.from_messages([
+        ("system", get_spec(agent_name).system),
+        MessagesPlaceholder(variable_name="chat_history", optional=True),
+        ("human", "{input}"),
+        MessagesPlaceholder(variable_name="agent_scratchpad")
+    ])
+
+
+@lru_cache(maxsize=None)
+def _tool_schemas(agent_name: str) -> str:
+    spec = get_spec(agent_name)
+    search = Tool(name="web_search", func=lambda query: "", description=spec.search_description)
+    return json.dumps([convert_to_openai_tool(search)], sort_keys=True)
+
+
+def get_tool_schemas(agent_name: str) -> List[dict]:
+    """Return the OpenAI tool schemas for the agent's tools, computed once per process."""
+    return json.loads(_tool_schemas(agent_name))
+
+
+@lru_cache(maxsize=None)
+def prompt_hash(agent_name: str) -> str:
+    """
+    Content hash of the agent's prompt version, system prompt and tool schemas.
+
+    Changes whenever anything sent ahead of the conversation changes, so it
+    can be used as a cache-key component.
+    """
+    spec = get_spec(agent_name)
+    payload = "\x1f".join([spec.name, str(spec.version), spec.system, _tool_schemas(agent_name)])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+@lru_cache(maxsize=None)
+def prompts_fingerprint(*agent_names: str) -> str:
+    """Combined hash of several agents' prompts, e.g. for results that depend on all of them."""
+    names = agent_names or tuple(sorted(PROMPTS))
+    joined = "|".join(f"{name}:{prompt_hash(name)}" for name in names)
+    return hashlib.sha256(joined.encode("utf-8")).hexdigest()[:16]
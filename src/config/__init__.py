@@ -4,14 +4,18 @@ from .constants import (
     MODEL_NAME,
     DEFAULT_TEMPERATURE,
     MAX_TOKENS,
+    REQUEST_TIMEOUT,
     MAX_ITERATIONS,
-    VERBOSE
+    VERBOSE,
+    ANALYSIS_TIMEOUT
 )
 
 __all__ = [
     'MODEL_NAME',
     'DEFAULT_TEMPERATURE',
     'MAX_TOKENS',
+    'REQUEST_TIMEOUT',
     'MAX_ITERATIONS',
-    'VERBOSE'
-] 
\ No newline at end of file
+    'VERBOSE',
+    'ANALYSIS_TIMEOUT'
+]
\ No newline at end of file
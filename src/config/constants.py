@@ -1,8 +1,75 @@
+import os
+
 # OpenAI Model Configuration
 MODEL_NAME = "gpt-4o-mini"
 DEFAULT_TEMPERATURE = 0.7
 MAX_TOKENS = 2000
+REQUEST_TIMEOUT = 60  # seconds per model request
 
 # Agent Configuration
+AGENT_TYPE = os.getenv("MRS_AGENT_TYPE", "tools")  # "tools" (parallel tool calls per turn) or "functions" (one call per turn)
 MAX_ITERATIONS = 5
-VERBOSE = True
\ No newline at end of file
+VERBOSE = os.getenv("MRS_VERBOSE", "0") == "1"  # LangChain stdout tracing; prefer MRS_LOG_LEVEL=DEBUG
+
+# Analysis Configuration
+ANALYSIS_TIMEOUT = 300  # seconds for a full analyze_company run
+
+# Logging Configuration
+LOG_LEVEL = os.getenv("MRS_LOG_LEVEL", "INFO")
+LOG_FORMAT = os.getenv("MRS_LOG_FORMAT", "text")  # "text" or "json"
+LOG_SAMPLE_RATE = float(os.getenv("MRS_LOG_SAMPLE_RATE", "1"))  # fraction of runs whose DEBUG/INFO records are kept
+LOG_MAX_PAYLOAD = 500  # characters of prompts, tool input and output kept per record
+LOG_QUEUE_SIZE = 10000  # buffered records before new ones are dropped
+
+# Shared Store Configuration
+STORE_PATH = os.getenv("MRS_STORE_PATH", os.path.join(".cache", "market_research.sqlite3"))
+
+# Request Coalescing Configuration
+COALESCE_LEASE_TTL = ANALYSIS_TIMEOUT + 30  # seconds before another process may take over
+COALESCE_RESULT_TTL = 60  # seconds a finished result stays visible to late joiners; identical requests in this window reuse it
+COALESCE_POLL_INTERVAL = 0.5  # seconds between checks while waiting on another run
+
+# Shared Cache and Rate Limit Configuration
+SEARCH_CACHE_TTL = 24 * 3600  # seconds a web search result is reused
+RATE_LIMIT_RPS = float(os.getenv("MRS_RATE_LIMIT_RPS", "5"))  # model requests per second, all workers combined
+RATE_LIMIT_BURST = 10
+
+# Search Backend Configuration
+SEARCH_URL = os.getenv("MRS_SEARCH_URL")  # HTTP search endpoint taking ?q=; DuckDuckGo when unset
+SEARCH_TIMEOUT = 15  # seconds per search request
+
+# Model-Call Cache Configuration
+CACHE_MODE = os.getenv("MRS_CACHE_MODE", "readwrite")  # "off", "readwrite", or "replay" (model calls and searches from cache only)
+LLM_CACHE_SAMPLED = os.getenv("MRS_LLM_CACHE_SAMPLED", "0") == "1"  # also cache calls with temperature > 0
+LLM_CACHE_MAX_ENTRIES = 50000
+
+# Scheduler Configuration
+SCHEDULER_CONCURRENCY = int(os.getenv("MRS_MAX_CONCURRENT_ANALYSES", "4"))  # analyses running at once per process
+SCHEDULER_RESERVED_INTERACTIVE = 1  # slots batch work may never occupy
+SCHEDULER_TOKENS_PER_MINUTE = int(os.getenv("MRS_TOKENS_PER_MINUTE", "200000"))  # estimated tokens admitted per minute
+SCHEDULER_WEIGHTS = {"interactive": 4, "batch": 1}  # fair-share weight per priority class
+SCHEDULER_METRICS_INTERVAL = float(os.getenv("MRS_SCHEDULER_METRICS_INTERVAL", "60"))  # seconds between metrics log records; 0 disables
+TENANT_TOKEN_BUDGET = int(os.getenv("MRS_TENANT_TOKEN_BUDGET", "0"))  # tokens per tenant per window; 0 is unlimited
+TENANT_BUDGET_WINDOW = 3600  # seconds
+ESTIMATED_ANALYSIS_TOKENS = 12000  # initial cost estimate, refined from completed runs
+
+# Adaptive Limits Configuration
+ADAPTIVE_LIMITS = os.getenv("MRS_ADAPTIVE_LIMITS", "1") == "1"  # learn max_iterations/max_tokens per agent and industry
+ADAPTIVE_MIN_SAMPLES = 20  # runs needed before observed statistics replace the defaults
+ADAPTIVE_HISTORY = 200  # most recent runs considered
+ADAPTIVE_QUANTILE = 0.95  # share of runs the limits should cover
+ADAPTIVE_TRUNCATION_TARGET = 0.02  # truncation or iteration-limit rate above which limits are raised
+ADAPTIVE_MIN_ITERATIONS = 2  # a search step and an answer step
+ADAPTIVE_MAX_ITERATIONS = 10
+ADAPTIVE_MIN_TOKENS = 256
+ADAPTIVE_MAX_TOKENS = 4000
+ADAPTIVE_REFRESH_INTERVAL = 60  # seconds limits are reused before statistics are re-read
+
+# Export Configuration
+EXPORT_CHECKPOINT_EVERY = 100  # records written between flushes of every export file
+EXPORT_FSYNC = os.getenv("MRS_EXPORT_FSYNC", "1") == "1"  # force checkpointed exports to disk
+
+# Serving Configuration
+NUM_WORKERS = int(os.getenv("MRS_WORKERS", "1"))  # analysis worker processes; 1 runs in-process
+DRAIN_TIMEOUT = 60  # seconds to let in-flight analyses finish on shutdown
+CANCEL_GRACE = 5  # seconds a cancelled run may take to stop and report the tokens it spent
\ No newline at end of file
@@ -1,13 +1,17 @@
 from src.agents.research_agent import ResearchAgent
+from src.utils.log import configure_logging
 import streamlit as st
+from streamlit.runtime import Runtime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from streamlit.runtime.scriptrunner_utils.script_requests import ScriptRequests, ScriptRequestType
 from dotenv import load_dotenv
 import os
-from typing import Optional
+from typing import Optional, Union
 import json
 import logging
 
 # Configure logging
-logging.basicConfig(level=logging.INFO)
+configure_logging()
 logger = logging.getLogger(__name__)
 
 # Load environment variables
@@ -18,6 +22,16 @@ from src.agents.research_agent import ResearchAgent
 from src.agents.market_agent import MarketAgent
 from src.agents.resource_agent import ResourceAgent
 from src.main import MarketResearchSystem
+from src.serving import WorkerPool
+from src.config.constants import ANALYSIS_TIMEOUT, NUM_WORKERS
+from src.utils.cancellation import AnalysisCancelled, CancelToken
+from src.utils.scheduler import BudgetExceeded, Priority
+
+# Streamlit keeps a session's pending rerun request in a private attribute;
+# without it only closed sessions cancel their analysis
+RERUN_DETECTABLE = hasattr(ScriptRequests(), "_state")
+if not RERUN_DETECTABLE:
+    logger.warning("This Streamlit version has no ScriptRequests._state; re-submitting will not cancel running analyses")
 
 
 # Initialize agents
@@ -36,8 +50,10 @@ def init_agents():
 
 # Initialize the system
 @st.cache_resource
-def get_system() -> Optional[MarketResearchSystem]:
+def get_system() -> Optional[Union[MarketResearchSystem, WorkerPool]]:
     try:
+        if NUM_WORKERS > 1:
+            return WorkerPool(NUM_WORKERS)
         return MarketResearchSystem()
     except ImportError as e:
         logger.error(f"Failed to initialize system due to import error: {e}")
@@ -50,6 +66,24 @@ def get_system() -> Optional[MarketResearchSystem]:
         st.info("Check your configuration and API key")
         return None
 
+def watch_session(token: CancelToken) -> None:
+    """Trip the token when the user leaves the page or re-submits the form."""
+    ctx = get_script_run_ctx()
+    if ctx is None:
+        return
+    runtime = Runtime.instance()
+    
+    def session_check() -> Optional[str]:
+        if not runtime.is_active_session(ctx.session_id):
+            return "session closed"
+        requests = ctx.script_requests
+        if RERUN_DETECTABLE and requests is not None and requests._state != ScriptRequestType.CONTINUE:
+            return "superseded by a new request"
+        return None
+    
+    token.add_check(session_check)
+
+
 def main():
     """Main Streamlit application."""
     st.set_page_config(
@@ -90,8 +124,12 @@ def main():
                     st.error("Failed to initialize the system. Please check your configuration.")
                     return
                 
+            cancel_token = CancelToken(timeout=ANALYSIS_TIMEOUT)
+            watch_session(cancel_token)
             with st.spinner("Analyzing company and industry..."):
-                results = system.analyze_company(company_name, industry)
+                results = system.analyze_company(
+                    company_name, industry, cancel_token=cancel_token, priority=Priority.INTERACTIVE
+                )
                 
                 # Display Results
                 st.header("Industry Analysis")
@@ -103,6 +141,12 @@ def main():
                 st.header("Implementation Resources")
                 st.markdown(results["resources"])
                 
+        except AnalysisCancelled as e:
+            logger.info(f"Analysis cancelled: {e.reason} ({e.wasted_tokens} tokens wasted)")
+            st.warning(f"Analysis stopped: {e.reason}")
+        except BudgetExceeded as e:
+            logger.warning(f"Analysis rejected: {e}")
+            st.error("The token budget for this workspace is used up. Please try again later.")
         except Exception as e:
             error_msg = str(e)
             logger.error(f"Error during analysis: {error_msg}")
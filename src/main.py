@@ -1,5 +1,8 @@
 """Main module for the Market Research System."""
 
+import logging
+from typing import Optional
+
 from .agents.market_agent import get_agent_response as market_agent_response
 from .agents.research_agent import get_agent_response as research_agent_response
 from .agents.resource_agent import get_agent_response as resource_agent_response
@@ -8,38 +11,110 @@ from .agents import (
     create_market_agent,
     create_resource_agent
 )
+from .agents.prompts import prompts_fingerprint
+from .config.constants import ANALYSIS_TIMEOUT
+from .utils.cancellation import AnalysisCancelled, CancelToken
+from .utils.coalescing import SingleFlight, analysis_key
+from .utils.log import current_run_id, log_context
+from .utils.scheduler import Priority, Scheduler, default_scheduler
+from .utils.store import default_store
+
+logger = logging.getLogger(__name__)
+
 
 class MarketResearchSystem:
     """Main class for the Market Research System."""
 
-    def __init__(self):
-        """Initialize the Market Research System."""
+    def __init__(self, flights: Optional[SingleFlight] = None, scheduler: Optional[Scheduler] = None):
+        """
+        Initialize the Market Research System.
+        
+        Args:
+            flights: Coalescer shared by identical concurrent requests; defaults to
+                one backed by the local store so other processes can join runs too
+            scheduler: Admission control in front of the agents; defaults to the process-wide scheduler
+        """
         self.research_agent = create_research_agent()
         self.market_agent = create_market_agent()
         self.resource_agent = create_resource_agent()
+        self.flights = flights or SingleFlight(default_store())
+        self.scheduler = scheduler or default_scheduler()
         
-    def analyze_company(self, company_name: str, industry: str) -> dict:
+    def analyze_company(self, company_name: str, industry: str,
+                        cancel_token: Optional[CancelToken] = None,
+                        timeout: Optional[float] = None,
+                        priority: Priority = Priority.INTERACTIVE,
+                        tenant: str = "default") -> dict:
         """
         Analyze a company using all agents.
         
+        Concurrent calls for the same company and industry, from this process or
+        another one sharing the local store, attach to a single run.
+        
         Args:
             company_name: Name of the company to analyze
             industry: Industry of the company
+            cancel_token: Token the caller can trip to abort the run early
+            timeout: Deadline in seconds for the whole run (defaults to ANALYSIS_TIMEOUT)
+            priority: Scheduling class; interactive work is admitted ahead of batch work
+            tenant: Owner charged for the tokens the run uses
             
         Returns:
             dict: Analysis results including research, market, and resource data
+            
+        Raises:
+            AnalysisCancelled: If the token is cancelled or the deadline passes
+            BudgetExceeded: If the tenant's token budget cannot cover the run
         """
-        research_prompt = f"Analyze the company {company_name} in the {industry} industry"
-        research_response = research_agent_response(self.research_agent, research_prompt)
+        token = cancel_token or CancelToken()
+        token.set_timeout(timeout if timeout is not None else ANALYSIS_TIMEOUT)
         
-        market_prompt = f"Generate AI/ML use cases for {company_name} in {industry}"
-        market_response = market_agent_response(self.market_agent, market_prompt)
+        with log_context(current_run_id()):
+            logger.info("Analyzing %s (%s)", company_name, industry)
+            try:
+                return self.flights.do(
+                    analysis_key(company_name, industry, prompts_fingerprint("research", "market", "resource")),
+                    lambda run_token: self._run_scheduled(company_name, industry, priority, tenant, run_token),
+                    token,
+                    on_attach=lambda run_token: self.scheduler.promote(run_token, priority)
+                )
+            except AnalysisCancelled as e:
+                logger.warning(
+                    "Analysis of %s (%s) cancelled: %s; %d tokens wasted",
+                    company_name, industry, e.reason, e.wasted_tokens
+                )
+                raise
+    
+    def _run_scheduled(self, company_name: str, industry: str, priority: Priority,
+                       tenant: str, token: CancelToken) -> dict:
+        """Wait for the scheduler to admit the run, then run the agents."""
+        with self.scheduler.slot(priority, tenant, token):
+            return self._run_agents(company_name, industry, token)
+    
+    def _run_agents(self, company_name: str, industry: str, token: CancelToken) -> dict:
+        """
+        Run the research, market and resource agents in turn.
         
-        resource_prompt = f"Find implementation resources for {company_name} in {industry}"
-        resource_response = resource_agent_response(self.resource_agent, resource_prompt)
-
-        return {
-            "industry_analysis": research_response,
-            "use_cases": market_response,
-            "resources": resource_response,
-        }
+        A failed step's field holds its error message and is also listed under
+        "errors", which keeps the result from being published for reuse.
+        """
+        steps = [
+            ("industry_analysis", research_agent_response, self.research_agent,
+             f"Analyze the company {company_name} in the {industry} industry"),
+            ("use_cases", market_agent_response, self.market_agent,
+             f"Generate AI/ML use cases for {company_name} in {industry}"),
+            ("resources", resource_agent_response, self.resource_agent,
+             f"Find implementation resources for {company_name} in {industry}"),
+        ]
+        result = {}
+        errors = {}
+        for field, respond, agent, prompt in steps:
+            try:
+                result[field] = respond(agent, prompt, token, industry, raise_errors=True)
+            except AnalysisCancelled:
+                raise
+            except Exception as e:
+                result[field] = errors[field] = str(e)
+        if errors:
+            result["errors"] = errors
+        return result
@@ -1,5 +1,6 @@
 """Run script for the Market Research System."""
 
+import argparse
 import os
 import sys
 from streamlit.web import cli as stcli
@@ -10,6 +11,17 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(os.path.dirname(current_dir))
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("MRS_WORKERS", "1")),
+        help="Number of analysis worker processes behind the web front end"
+    )
+    args = parser.parse_args()
+    # Read by src.config.constants when the app is imported
+    os.environ["MRS_WORKERS"] = str(args.workers)
+    
     # Get the path to the app.py file
     app_path = os.path.join(current_dir, "interface", "app.py")
     
@@ -0,0 +1,204 @@
+"""Multi-process serving mode for the Market Research System."""
+
+import atexit
+import logging
+import multiprocessing
+import signal
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, Optional, Tuple
+
+from .config.constants import ANALYSIS_TIMEOUT, CANCEL_GRACE, DRAIN_TIMEOUT, NUM_WORKERS
+from .utils.cancellation import AnalysisCancelled, CancelToken
+from .utils.coalescing import SingleFlight, analysis_key
+from .utils.log import configure_logging, log_context
+from .utils.scheduler import Priority, Scheduler, unlimited_scheduler
+from .utils.store import default_store
+
+logger = logging.getLogger(__name__)
+
+_system = None
+
+
+def _init_worker() -> None:
+    """Build one MarketResearchSystem per worker process."""
+    global _system
+    # Shutdown is driven by the front end, which drains before stopping workers
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    configure_logging()
+    from .main import MarketResearchSystem
+    # Admission, budgets and priorities are decided once, by the front end's scheduler
+    _system = MarketResearchSystem(scheduler=unlimited_scheduler())
+
+
+def _exit_on_sigterm(signum, frame) -> None:
+    """Turn SIGTERM into a normal interpreter exit, so the pool's exit hook drains it."""
+    raise SystemExit(128 + signum)
+
+
+def _analyze(request_id: str, company_name: str, industry: str,
+             priority: Priority, tenant: str) -> Tuple[dict, int]:
+    """Run one analysis inside a worker process and return it with the tokens it used."""
+    store = default_store()
+    token = CancelToken()
+    token.add_check(lambda: store.cancel_reason(request_id))
+    try:
+        with log_context(request_id):
+            result = _system.analyze_company(
+                company_name, industry, cancel_token=token, priority=priority, tenant=tenant
+            )
+        return result, token.tokens_used
+    except AnalysisCancelled as e:
+        # Exceptions lose their token count crossing the process boundary
+        store.record_usage(request_id, e.wasted_tokens)
+        raise
+    finally:
+        store.clear_cancel(request_id)
+
+
+class WorkerPool:
+    """
+    Runs analyses on a pool of worker processes behind a single front end.
+
+    Each worker owns its agents, so prompt building and output parsing run in
+    parallel instead of contending for one GIL. Workers share the result,
+    search and rate-limit tables of the local store, which keeps coalescing,
+    caching and the request budget global. Admission is decided here, in
+    the front end, by a scheduler sized to the worker count, and identical
+    concurrent requests are coalesced here too, so they take one slot and
+    one worker between them.
+    `analyze_company` mirrors `MarketResearchSystem.analyze_company`, so
+    callers can use either.
+    """
+
+    def __init__(self, num_workers: int = NUM_WORKERS, drain_timeout: float = DRAIN_TIMEOUT):
+        """
+        Args:
+            num_workers: Number of worker processes
+            drain_timeout: Seconds `shutdown` waits for in-flight analyses
+        """
+        self.num_workers = num_workers
+        self.drain_timeout = drain_timeout
+        self.store = default_store()
+        self.scheduler = Scheduler(concurrency=num_workers)
+        self.flights = SingleFlight()
+        self._executor = ProcessPoolExecutor(
+            max_workers=num_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker
+        )
+        self._pending: Dict[Future, str] = {}
+        self._lock = threading.Lock()
+        self._draining = False
+        # ProcessPoolExecutor's exit hook waits for every pending analysis before
+        # atexit handlers run; hooks registered later run first, so this one
+        # drains with the timeout and cancels leftovers before it. The hook is
+        # private to CPython 3.9+; older interpreters drain without a timeout.
+        register_exit_hook = getattr(threading, "_register_atexit", None)
+        if register_exit_hook is not None:
+            register_exit_hook(self.shutdown)
+        else:
+            atexit.register(self.shutdown)
+        if (threading.current_thread() is threading.main_thread()
+                and signal.getsignal(signal.SIGTERM) == signal.SIG_DFL):
+            signal.signal(signal.SIGTERM, _exit_on_sigterm)
+
+    def analyze_company(self, company_name: str, industry: str,
+                        cancel_token: Optional[CancelToken] = None,
+                        timeout: Optional[float] = None,
+                        priority: Priority = Priority.INTERACTIVE,
+                        tenant: str = "default") -> dict:
+        """
+        Analyze a company on the next free worker.
+
+        Args:
+            company_name: Name of the company to analyze
+            industry: Industry of the company
+            cancel_token: Token the caller can trip to abort the run early
+            timeout: Deadline in seconds for the whole run (defaults to ANALYSIS_TIMEOUT)
+            priority: Scheduling class; interactive work is admitted ahead of batch work
+            tenant: Owner charged for the tokens the run uses
+
+        Returns:
+            dict: Analysis results including research, market, and resource data
+
+        Raises:
+            AnalysisCancelled: If the token is cancelled or the deadline passes
+            BudgetExceeded: If the tenant's token budget cannot cover the run
+            RuntimeError: If the pool is draining
+        """
+        token = cancel_token or CancelToken()
+        token.set_timeout(timeout if timeout is not None else ANALYSIS_TIMEOUT)
+        return self.flights.do(
+            analysis_key(company_name, industry),
+            lambda run_token: self._run_scheduled(company_name, industry, priority, tenant, run_token),
+            token,
+            on_attach=lambda run_token: self.scheduler.promote(run_token, priority)
+        )
+
+    def _run_scheduled(self, company_name: str, industry: str, priority: Priority,
+                       tenant: str, token: CancelToken) -> dict:
+        """Wait for the scheduler to admit the run, then hand it to a worker."""
+        with self.scheduler.slot(priority, tenant, token):
+            return self._run_on_worker(company_name, industry, token, priority, tenant)
+
+    def _run_on_worker(self, company_name: str, industry: str, token: CancelToken,
+                       priority: Priority, tenant: str) -> dict:
+        """Submit the analysis to the pool and wait for it, honouring the token."""
+        request_id = uuid.uuid4().hex
+        with self._lock:
+            if self._draining:
+                raise RuntimeError("Worker pool is shutting down")
+            # The deadline is enforced here, since coalesced callers can extend it after
+            # submission; the worker only applies its ANALYSIS_TIMEOUT backstop
+            future = self._executor.submit(_analyze, request_id, company_name, industry, priority, tenant)
+            self._pending[future] = request_id
+        future.add_done_callback(self._discard)
+
+        while not future.done():
+            if token.wait(0.1):
+                # Queued work is dropped outright; running work is told to stop via the
+                # store, and what it spent is charged before the slot is released
+                if not future.cancel():
+                    self.store.request_cancel(request_id, token.reason)
+                    token.add_tokens(self._wasted_tokens(future, request_id))
+                raise AnalysisCancelled(token.reason, token.tokens_used)
+        result, tokens_used = future.result()
+        token.add_tokens(tokens_used)
+        return result
+
+    def _wasted_tokens(self, future: Future, request_id: str) -> int:
+        """Wait up to CANCEL_GRACE for a cancelled worker run to stop and return the tokens it spent."""
+        try:
+            # The run may have finished before it saw the cancellation
+            return future.result(timeout=CANCEL_GRACE)[1]
+        except Exception:
+            return self.store.pop_usage(request_id) or 0
+
+    def _discard(self, future: Future) -> None:
+        with self._lock:
+            self._pending.pop(future, None)
+
+    def stats(self) -> Dict[str, int]:
+        """Return the worker count and the number of queued or running analyses."""
+        with self._lock:
+            return {"workers": self.num_workers, "pending": len(self._pending)}
+
+    def shutdown(self) -> None:
+        """Stop accepting work, let in-flight analyses finish, then stop the workers."""
+        with self._lock:
+            if self._draining:
+                return
+            self._draining = True
+        deadline = time.monotonic() + self.drain_timeout
+        while self.stats()["pending"] and time.monotonic() < deadline:
+            time.sleep(0.2)
+        with self._lock:
+            leftover = list(self._pending.values())
+        if leftover:
+            logger.warning("Drain timed out with %d analyses still pending", len(leftover))
+            for request_id in leftover:
+                self.store.request_cancel(request_id, "server shutting down")
+        self._executor.shutdown(wait=True, cancel_futures=True)
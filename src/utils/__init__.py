@@ -1,5 +1,28 @@
 """Utilities module initialization."""
 
 from .web_search import WebSearchTool
+from .cancellation import AnalysisCancelled, CancelToken
+from .coalescing import SingleFlight, analysis_key
+from .store import LocalStore
+from .llm_cache import LLMCache, llm_cache_stats
+from .scheduler import BudgetExceeded, Priority, Scheduler
+from .export import ExportWriter, export_batch
+from .adaptive_limits import AdaptiveLimits, AgentLimits
 
-__all__ = ['WebSearchTool'] 
\ No newline at end of file
+__all__ = [
+    'WebSearchTool',
+    'AnalysisCancelled',
+    'CancelToken',
+    'SingleFlight',
+    'analysis_key',
+    'LocalStore',
+    'LLMCache',
+    'llm_cache_stats',
+    'BudgetExceeded',
+    'Priority',
+    'Scheduler',
+    'ExportWriter',
+    'export_batch',
+    'AdaptiveLimits',
+    'AgentLimits'
+]
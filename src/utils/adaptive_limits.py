@@ -0,0 +1,214 @@
+"""Per-agent iteration and token limits learned from earlier runs."""
+
+import math
+import threading
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from ..config.constants import (
+    ADAPTIVE_HISTORY,
+    ADAPTIVE_LIMITS,
+    ADAPTIVE_MAX_ITERATIONS,
+    ADAPTIVE_MAX_TOKENS,
+    ADAPTIVE_MIN_ITERATIONS,
+    ADAPTIVE_MIN_SAMPLES,
+    ADAPTIVE_MIN_TOKENS,
+    ADAPTIVE_QUANTILE,
+    ADAPTIVE_REFRESH_INTERVAL,
+    ADAPTIVE_TRUNCATION_TARGET,
+    CACHE_MODE,
+    MAX_ITERATIONS,
+    MAX_TOKENS
+)
+from .store import LocalStore, default_store
+from .usage import token_usage
+
+# Limits are rounded up to this many tokens so they, and the model-call cache keys that include them, stay stable
+TOKEN_STEP = 256
+# Telemetry older than this is dropped
+TELEMETRY_MAX_AGE = 30 * 24 * 3600
+
+
+class AgentLimits(NamedTuple):
+    max_iterations: int
+    max_tokens: int
+
+
+class RunTelemetryHandler(BaseCallbackHandler):
+    """Counts model calls, completion tokens and truncations during one agent run."""
+
+    run_inline = True
+
+    def __init__(self):
+        self.iterations = 0
+        self.completion_tokens = 0
+        self.longest_completion = 0
+        self.truncated = False
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        self.iterations += 1
+        completion = token_usage(response)["completion_tokens"]
+        self.completion_tokens += completion
+        self.longest_completion = max(self.longest_completion, completion)
+        for generations in response.generations:
+            for generation in generations:
+                if (generation.generation_info or {}).get("finish_reason") == "length":
+                    self.truncated = True
+
+
+def _quantile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(math.ceil(q * len(ordered))) - 1)]
+
+
+def _normalize(industry: Optional[str]) -> str:
+    return " ".join((industry or "").lower().split())
+
+
+class AdaptiveLimits:
+    """
+    Chooses `max_iterations` and `max_tokens` for each agent run.
+
+    Limits come from the recent runs of the same agent for the same
+    industry, falling back to all industries and then to the global
+    defaults until there are enough samples. Iterations cover the chosen
+    quantile plus one step of headroom; the token limit covers the chosen
+    quantile of the longest completion per run with 25% headroom. When more
+    runs than the target rate were truncated or stopped at the iteration
+    limit, the limit is raised above the one they ran under instead.
+
+    In replay mode limits are pinned to those of the most recent recorded
+    run and nothing is recorded, since `max_tokens` is part of every
+    model-call cache key and drifting limits would miss the recording.
+    """
+
+    def __init__(self, store: Optional[LocalStore] = None, enabled: bool = ADAPTIVE_LIMITS,
+                 defaults: AgentLimits = AgentLimits(MAX_ITERATIONS, MAX_TOKENS),
+                 min_samples: int = ADAPTIVE_MIN_SAMPLES, history: int = ADAPTIVE_HISTORY,
+                 quantile: float = ADAPTIVE_QUANTILE, truncation_target: float = ADAPTIVE_TRUNCATION_TARGET,
+                 iteration_bounds: Tuple[int, int] = (ADAPTIVE_MIN_ITERATIONS, ADAPTIVE_MAX_ITERATIONS),
+                 token_bounds: Tuple[int, int] = (ADAPTIVE_MIN_TOKENS, ADAPTIVE_MAX_TOKENS),
+                 refresh_interval: float = ADAPTIVE_REFRESH_INTERVAL,
+                 replay: bool = CACHE_MODE == "replay"):
+        """
+        Args:
+            store: Store holding the telemetry (defaults to the process-wide store)
+            enabled: When False, every run gets `defaults`
+            defaults: Limits used until enough runs have been observed
+            min_samples: Runs needed before observed statistics are used
+            history: Most recent runs considered
+            quantile: Share of runs the limits should accommodate
+            truncation_target: Truncation or iteration-limit rate above which limits are raised
+            iteration_bounds: Safety floor and cap for max_iterations
+            token_bounds: Safety floor and cap for max_tokens
+            refresh_interval: Seconds computed limits are reused before telemetry is re-read
+            replay: Pin limits to the latest recorded run's and stop recording
+        """
+        self.enabled = enabled
+        self.defaults = defaults
+        self.min_samples = min_samples
+        self.history = history
+        self.quantile = quantile
+        self.truncation_target = truncation_target
+        self.iteration_bounds = iteration_bounds
+        self.token_bounds = token_bounds
+        self.refresh_interval = refresh_interval
+        self.replay = replay
+        self._store = store
+        self._cache: Dict[Tuple[str, str], Tuple[float, AgentLimits]] = {}
+        self._lock = threading.Lock()
+        self._recorded = 0
+
+    @property
+    def store(self) -> LocalStore:
+        if self._store is None:
+            self._store = default_store()
+        return self._store
+
+    def limits(self, agent: str, industry: Optional[str] = None) -> AgentLimits:
+        """
+        Return the limits for the next run of `agent` on `industry`.
+
+        Args:
+            agent: Agent name, e.g. "research"
+            industry: Industry of the analysis; None uses the agent's overall statistics
+        """
+        if not self.enabled:
+            return self.defaults
+        key = (agent, _normalize(industry))
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and (self.replay or now - cached[0] < self.refresh_interval):
+                return cached[1]
+
+        if self.replay:
+            runs = (self.store.agent_runs(agent, key[1], 1) if key[1] else []) or self.store.agent_runs(agent, None, 1)
+            limits = AgentLimits(runs[0]["max_iterations"], runs[0]["max_tokens"]) if runs else self.defaults
+        else:
+            runs = self.store.agent_runs(agent, key[1], self.history) if key[1] else []
+            if len(runs) < self.min_samples:
+                runs = self.store.agent_runs(agent, None, self.history)
+            limits = self._derive(runs) if len(runs) >= self.min_samples else self.defaults
+        with self._lock:
+            self._cache[key] = (now, limits)
+        return limits
+
+    def _derive(self, runs: List[Dict]) -> AgentLimits:
+        low, high = self.iteration_bounds
+        iterations = int(_quantile([run["iterations"] for run in runs], self.quantile)) + 1
+        stopped = [run for run in runs if run["hit_iteration_limit"]]
+        if len(stopped) / len(runs) > self.truncation_target:
+            iterations = max(iterations, max(run["max_iterations"] for run in stopped) + 1)
+        iterations = max(low, min(high, iterations))
+
+        low, high = self.token_bounds
+        tokens = _quantile([run["longest_completion"] for run in runs], self.quantile) * 1.25
+        truncated = [run for run in runs if run["truncated"]]
+        if len(truncated) / len(runs) > self.truncation_target:
+            tokens = max(tokens, max(run["max_tokens"] for run in truncated) * 1.5)
+        tokens = int(math.ceil(tokens / TOKEN_STEP)) * TOKEN_STEP
+        return AgentLimits(iterations, max(low, min(high, tokens)))
+
+    def record(self, agent: str, industry: Optional[str], telemetry: RunTelemetryHandler,
+               limits: AgentLimits, output: str = "") -> None:
+        """
+        Store the telemetry of a finished run; does nothing in replay mode.
+
+        Args:
+            agent: Agent name
+            industry: Industry of the analysis
+            telemetry: Handler that observed the run
+            limits: Limits the run was given
+            output: Final agent output; the executor's stop message marks a run cut off by the iteration limit
+        """
+        if self.replay:
+            return
+        # A run that finishes on its last allowed call did not hit the limit
+        hit_limit = output.startswith("Agent stopped due to")
+        self.store.record_agent_run(
+            agent, _normalize(industry), telemetry.iterations, telemetry.completion_tokens,
+            telemetry.longest_completion, telemetry.truncated, hit_limit,
+            limits.max_iterations, limits.max_tokens
+        )
+        with self._lock:
+            self._recorded += 1
+            purge = self._recorded % 1000 == 0
+        if purge:
+            self.store.purge_agent_runs(TELEMETRY_MAX_AGE)
+
+
+_default_limits: Optional[AdaptiveLimits] = None
+_default_lock = threading.Lock()
+
+
+def default_limits() -> AdaptiveLimits:
+    """Return the process-wide limits engine, creating it on first use."""
+    global _default_limits
+    with _default_lock:
+        if _default_limits is None:
+            _default_limits = AdaptiveLimits()
+    return _default_limits
@@ -0,0 +1,189 @@
+"""Cooperative cancellation and deadlines for in-flight analyses."""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import CancelledError
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from .log import current_run_id, log_context
+from .usage import token_usage
+
+
+class AnalysisCancelled(Exception):
+    """Raised when an analysis is cancelled or runs past its deadline."""
+
+    def __init__(self, reason: str, wasted_tokens: int = 0):
+        super().__init__(f"Analysis cancelled: {reason}")
+        self.reason = reason
+        self.wasted_tokens = wasted_tokens
+
+
+class CancelToken:
+    """
+    Thread-safe cancellation flag shared by every step of one analysis.
+
+    A token trips when `cancel()` is called, when its deadline passes, or when
+    one of its registered checks reports a reason (e.g. the UI session closed).
+    It also accumulates the tokens spent so far, so a cancelled run can report
+    how much work was thrown away.
+    """
+
+    def __init__(self, timeout: Optional[float] = None):
+        """
+        Args:
+            timeout: Seconds from now after which the token trips on its own
+        """
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._checks: List[Callable[[], Optional[str]]] = []
+        self.reason: Optional[str] = None
+        self.deadline: Optional[float] = None
+        self.tokens_used = 0
+        if timeout is not None:
+            self.set_timeout(timeout)
+
+    def set_timeout(self, timeout: float) -> None:
+        """Tighten the deadline to `timeout` seconds from now (never extends it)."""
+        deadline = time.monotonic() + timeout
+        if self.deadline is None or deadline < self.deadline:
+            self.deadline = deadline
+
+    def extend_deadline(self, deadline: Optional[float]) -> None:
+        """Loosen the deadline to the monotonic time `deadline`; None removes it."""
+        with self._lock:
+            if self.deadline is not None and (deadline is None or deadline > self.deadline):
+                self.deadline = deadline
+
+    def add_check(self, check: Callable[[], Optional[str]]) -> None:
+        """Register a callable that returns a cancellation reason or None."""
+        self._checks.append(check)
+
+    def cancel(self, reason: str = "cancelled by caller") -> None:
+        """Trip the token; the first reason given wins."""
+        with self._lock:
+            if self.reason is None:
+                self.reason = reason
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether the run should stop."""
+        if self._event.is_set():
+            return True
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            self.cancel("deadline exceeded")
+            return True
+        for check in self._checks:
+            reason = check()
+            if reason:
+                self.cancel(reason)
+                return True
+        return False
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the deadline, or None when there is none."""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def wait(self, timeout: float) -> bool:
+        """Block for up to `timeout` seconds; return True once cancelled."""
+        remaining = self.remaining()
+        if remaining is not None:
+            timeout = min(timeout, remaining)
+        self._event.wait(timeout)
+        return self.cancelled
+
+    def add_tokens(self, count: int) -> None:
+        """Record tokens consumed on behalf of this run."""
+        with self._lock:
+            self.tokens_used += count
+
+    def raise_if_cancelled(self) -> None:
+        """Raise `AnalysisCancelled` if the token has tripped."""
+        if self.cancelled:
+            raise AnalysisCancelled(self.reason, self.tokens_used)
+
+
+class CancellationCallbackHandler(BaseCallbackHandler):
+    """Checks a `CancelToken` between agent iterations, LLM calls and tool calls."""
+
+    raise_error = True
+    run_inline = True
+
+    def __init__(self, token: CancelToken):
+        self.token = token
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: List[List[Any]], **kwargs: Any) -> None:
+        self.token.raise_if_cancelled()
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: List[str], **kwargs: Any) -> None:
+        self.token.raise_if_cancelled()
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        self.token.add_tokens(token_usage(response)["total_tokens"])
+
+    def on_agent_action(self, action: Any, **kwargs: Any) -> None:
+        self.token.raise_if_cancelled()
+
+    def on_tool_start(self, serialized: Dict[str, Any], input_str: str, **kwargs: Any) -> None:
+        self.token.raise_if_cancelled()
+
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """Return the background event loop that runs cancellable agent calls."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="agent-io-loop", daemon=True).start()
+    return _loop
+
+
+async def _in_log_context(run_id: Optional[str], awaitable: Awaitable) -> Any:
+    """Await `awaitable` with the caller's correlation id active on the loop."""
+    with log_context(run_id):
+        return await awaitable
+
+
+def invoke_with_cancellation(runnable: Any, inputs: Dict[str, Any], token: CancelToken,
+                             callbacks: Optional[List[BaseCallbackHandler]] = None,
+                             poll_interval: float = 0.1) -> Any:
+    """
+    Invoke a runnable so that cancelling `token` aborts it mid-flight.
+
+    The runnable runs on a background event loop. As soon as the token trips,
+    the caller is released and the pending task is cancelled, which also
+    aborts any in-flight async HTTP request to the model provider.
+
+    Args:
+        runnable: Agent executor or other LangChain runnable
+        inputs: Input dictionary passed to `ainvoke`
+        token: Cancellation token for this run
+        callbacks: Extra callback handlers for the run
+        poll_interval: Seconds between token checks while waiting
+
+    Returns:
+        The runnable's output
+    """
+    token.raise_if_cancelled()
+    config = {"callbacks": [CancellationCallbackHandler(token), *(callbacks or [])]}
+    future = asyncio.run_coroutine_threadsafe(
+        _in_log_context(current_run_id(), runnable.ainvoke(inputs, config=config)), _get_loop()
+    )
+    while not future.done():
+        if token.wait(poll_interval):
+            future.cancel()
+            raise AnalysisCancelled(token.reason, token.tokens_used)
+    try:
+        return future.result()
+    except CancelledError:
+        raise AnalysisCancelled(token.reason or "task cancelled", token.tokens_used)
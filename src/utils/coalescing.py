@@ -0,0 +1,197 @@
+"""Single-flight coalescing of identical concurrent analyses."""
+
+import contextvars
+import json
+import logging
+import os
+import socket
+import threading
+import uuid
+from typing import Any, Callable, Dict, Optional
+
+from ..config.constants import CANCEL_GRACE, COALESCE_LEASE_TTL, COALESCE_POLL_INTERVAL, COALESCE_RESULT_TTL
+from .cancellation import AnalysisCancelled, CancelToken
+from .store import LocalStore
+
+logger = logging.getLogger(__name__)
+
+
+def analysis_key(company_name: str, industry: str, version: str = "") -> str:
+    """
+    Build the coalescing key for a (company, industry) request.
+
+    Args:
+        company_name: Company being analyzed
+        industry: Industry of the company
+        version: Fingerprint of whatever else shapes the result, e.g. the
+            agents' prompts, so results from an older version are not reused
+    """
+    company = " ".join(company_name.lower().split())
+    industry = " ".join(industry.lower().split())
+    prefix = f"analysis:{version}:" if version else "analysis:"
+    return f"{prefix}{company}|{industry}"
+
+
+class _Flight:
+    """One in-flight computation and the callers attached to it."""
+
+    def __init__(self):
+        self.token = CancelToken()
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.callers = 0
+
+
+class SingleFlight:
+    """
+    Attach concurrent callers with the same key to one computation.
+
+    Within a process, callers share an in-memory flight. Across processes,
+    the computing process holds a lease row in the local store and publishes
+    its result there; other processes poll for that result instead of
+    starting their own run, and take over if the lease expires without one.
+
+    The computation runs on its own thread with its own `CancelToken`, so a
+    caller that cancels or reaches its deadline only detaches itself. The
+    shared run's deadline is the latest of its callers' deadlines, and the
+    run is cancelled once every attached caller has gone.
+    """
+
+    def __init__(self, store: Optional[LocalStore] = None,
+                 lease_ttl: float = COALESCE_LEASE_TTL,
+                 result_ttl: float = COALESCE_RESULT_TTL,
+                 poll_interval: float = COALESCE_POLL_INTERVAL,
+                 cancel_grace: float = CANCEL_GRACE):
+        """
+        Args:
+            store: Shared store for cross-process coordination; in-process only if None
+            lease_ttl: Seconds a computing process may hold a key before others take over
+            result_ttl: Seconds a published result stays visible to late joiners
+            poll_interval: Seconds between store polls while another process computes
+            cancel_grace: Seconds the last caller to cancel waits for the run to stop,
+                so the tokens it wasted are known
+        """
+        self.store = store
+        self.lease_ttl = lease_ttl
+        self.result_ttl = result_ttl
+        self.poll_interval = poll_interval
+        self.cancel_grace = cancel_grace
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._flights: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+
+    def inflight(self) -> int:
+        """Number of distinct computations currently running in this process."""
+        with self._lock:
+            return len(self._flights)
+
+    def do(self, key: str, fn: Callable[[CancelToken], Dict], cancel_token: CancelToken,
+           on_attach: Optional[Callable[[CancelToken], None]] = None) -> Dict:
+        """
+        Run `fn` for `key`, or attach to the run already in progress.
+
+        Args:
+            key: Coalescing key, e.g. from `analysis_key`
+            fn: Computation; receives the shared run's cancel token and returns a
+                JSON-serializable dict. A dict with a non-empty "errors" entry is
+                returned to the attached callers but not published to other processes.
+            cancel_token: The caller's own token
+            on_attach: Called with the shared run's token when this caller joins a
+                run already in progress, e.g. to raise the run's priority
+
+        Returns:
+            The computation's result. The caller that started the run is
+            charged its tokens on `cancel_token`; callers that attached are not.
+
+        Raises:
+            AnalysisCancelled: If the caller's token trips before the result is ready
+        """
+        cancel_token.raise_if_cancelled()
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None or flight.token.cancelled
+            if leader:
+                flight = _Flight()
+                flight.token.deadline = cancel_token.deadline
+                self._flights[key] = flight
+                # Run under the leader's context so its correlation id follows the work
+                threading.Thread(
+                    target=contextvars.copy_context().run, args=(self._run, key, fn, flight),
+                    name=f"flight-{key}", daemon=True
+                ).start()
+            else:
+                logger.info("Coalescing request for %s onto in-flight run", key)
+                flight.token.extend_deadline(cancel_token.deadline)
+            flight.callers += 1
+
+        if not leader and on_attach is not None:
+            on_attach(flight.token)
+
+        try:
+            # Wake on completion right away; the caller's own token and deadline are checked between waits
+            while not flight.done.wait(self.poll_interval):
+                if cancel_token.cancelled:
+                    raise AnalysisCancelled(cancel_token.reason, 0)
+        except AnalysisCancelled as e:
+            if self._detach(flight, e.reason):
+                flight.done.wait(self.cancel_grace)
+                e.wasted_tokens = flight.token.tokens_used
+            raise
+        self._detach(flight)
+
+        if leader:
+            cancel_token.add_tokens(flight.token.tokens_used)
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    def _detach(self, flight: _Flight, reason: Optional[str] = None) -> bool:
+        """Drop one caller; cancel the shared run with the last caller's reason and return True when none are left."""
+        with self._lock:
+            flight.callers -= 1
+            if flight.callers == 0 and not flight.done.is_set():
+                flight.token.cancel(reason or "all callers cancelled")
+                return True
+            return False
+
+    def _run(self, key: str, fn: Callable[[CancelToken], Dict], flight: _Flight) -> None:
+        """Compute (or wait for another process to compute) the result for `key`."""
+        try:
+            flight.result = self._run_shared(key, fn, flight.token)
+        except BaseException as e:
+            flight.error = e
+        finally:
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+            flight.done.set()
+
+    def _run_shared(self, key: str, fn: Callable[[CancelToken], Dict], token: CancelToken) -> Dict:
+        """Coordinate with other processes through the store's lease table."""
+        if self.store is None:
+            return fn(token)
+
+        while True:
+            payload = self.store.get_result(key, self.result_ttl)
+            if payload is not None:
+                logger.info("Reusing result for %s published by another process", key)
+                return json.loads(payload)
+            if self.store.try_acquire_lease(key, self.owner, self.lease_ttl):
+                break
+            if token.wait(self.poll_interval):
+                raise AnalysisCancelled(token.reason, 0)
+
+        try:
+            payload = self.store.get_result(key, self.result_ttl)
+            if payload is not None:
+                return json.loads(payload)
+            result = fn(token)
+            if result.get("errors"):
+                logger.warning("Not publishing failed result for %s: %s", key, ", ".join(result["errors"]))
+            else:
+                self.store.put_result(key, json.dumps(result))
+            return result
+        finally:
+            self.store.release_lease(key, self.owner)
+            self.store.purge_results(self.result_ttl)
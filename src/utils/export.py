@@ -0,0 +1,335 @@
+"""Streaming export of analyses and their records to JSONL, Arrow and Parquet."""
+
+import enum
+import glob
+import json
+import logging
+import os
+import typing
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple, Type, Union
+
+from pydantic import BaseModel
+
+from ..config.constants import EXPORT_CHECKPOINT_EVERY, EXPORT_FSYNC
+from ..models import IndustryAnalysis, Resource, UseCase
+from .cancellation import CancelToken
+from .scheduler import Priority
+
+if TYPE_CHECKING:
+    import pyarrow
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("jsonl", "arrow", "parquet")
+
+# File stem per record type; analyses are the dicts returned by analyze_company
+RECORD_KINDS: Dict[Type[BaseModel], str] = {
+    UseCase: "use_cases",
+    Resource: "resources",
+    IndustryAnalysis: "industry_analyses",
+}
+ANALYSIS_KIND = "analyses"
+ANALYSIS_FIELDS = ("industry_analysis", "use_cases", "resources")
+
+
+def _pyarrow():
+    """Import pyarrow, which only the "arrow" and "parquet" formats need."""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Arrow and Parquet export require pyarrow: pip install pyarrow") from None
+    return pyarrow, pyarrow.parquet
+
+
+def _arrow_type(annotation: Any) -> "pyarrow.DataType":
+    """Map a model field annotation to an Arrow type."""
+    pa, _ = _pyarrow()
+    origin = typing.get_origin(annotation)
+    if origin in (list, List):
+        return pa.list_(_arrow_type(typing.get_args(annotation)[0]))
+    if origin is Union:
+        return _arrow_type(next(arg for arg in typing.get_args(annotation) if arg is not type(None)))
+    if annotation is int:
+        return pa.int64()
+    if annotation is float:
+        return pa.float64()
+    if annotation is bool:
+        return pa.bool_()
+    return pa.string()
+
+
+def arrow_schema(kind: str) -> "pyarrow.Schema":
+    """
+    Arrow schema for one record kind.
+
+    Args:
+        kind: A value of RECORD_KINDS, or ANALYSIS_KIND
+
+    Returns:
+        The context columns followed by the record's own fields
+    """
+    pa, _ = _pyarrow()
+    if kind == ANALYSIS_KIND:
+        fields = [pa.field(name, pa.string()) for name in ANALYSIS_FIELDS + ("error",)]
+    else:
+        model = next(model for model, name in RECORD_KINDS.items() if name == kind)
+        fields = [pa.field(name, _arrow_type(info.annotation)) for name, info in model.model_fields.items()]
+    context = [
+        pa.field("company", pa.string()),
+        pa.field("industry", pa.string()),
+        pa.field("exported_at", pa.timestamp("ms", tz="UTC")),
+    ]
+    return pa.schema(context + fields)
+
+
+def _plain(value: Any) -> Any:
+    return value.value if isinstance(value, enum.Enum) else value
+
+
+def _json_default(value: Any) -> str:
+    return value.isoformat() if isinstance(value, datetime) else str(value)
+
+
+class _Sink:
+    """The open files for one record kind."""
+
+    def __init__(self, directory: str, kind: str, formats: Set[str], fsync: bool):
+        self.kind = kind
+        self.fsync = fsync
+        self.pa, self.pq = _pyarrow() if formats & {"arrow", "parquet"} else (None, None)
+        self.rows: List[Dict] = []
+        self.jsonl = open(os.path.join(directory, f"{kind}.jsonl"), "w", encoding="utf-8") if "jsonl" in formats else None
+        self.schema = arrow_schema(kind) if formats & {"arrow", "parquet"} else None
+
+        self.arrow_file = None
+        self.arrow_writer = None
+        if "arrow" in formats:
+            self.arrow_file = open(os.path.join(directory, f"{kind}.arrows"), "wb")
+            self.arrow_writer = self.pa.ipc.new_stream(self.arrow_file, self.schema)
+
+        self.parquet_dir = None
+        self.parts = 0
+        if "parquet" in formats:
+            self.parquet_dir = os.path.join(directory, kind)
+            os.makedirs(self.parquet_dir, exist_ok=True)
+            for stale in glob.glob(os.path.join(self.parquet_dir, "part-*.parquet")):
+                os.remove(stale)
+
+    def write(self, row: Dict) -> None:
+        if self.jsonl is not None:
+            self.jsonl.write(json.dumps(row, default=_json_default) + "\n")
+        if self.schema is not None:
+            self.rows.append(row)
+
+    def checkpoint(self) -> None:
+        """Make everything written so far visible to readers."""
+        if self.jsonl is not None:
+            self._sync(self.jsonl)
+        if not self.rows:
+            return
+        batch = self.pa.RecordBatch.from_pylist(self.rows, schema=self.schema)
+        self.rows = []
+        if self.arrow_writer is not None:
+            self.arrow_writer.write_batch(batch)
+            self._sync(self.arrow_file)
+        if self.parquet_dir is not None:
+            # Parquet is only readable once its footer is written, so each checkpoint
+            # closes a part under a temporary name and publishes it by rename
+            final = os.path.join(self.parquet_dir, f"part-{self.parts:05d}.parquet")
+            self.pq.write_table(self.pa.Table.from_batches([batch]), final + ".tmp")
+            os.replace(final + ".tmp", final)
+            self.parts += 1
+
+    def _sync(self, f) -> None:
+        f.flush()
+        if self.fsync:
+            os.fsync(f.fileno())
+
+    def close(self) -> None:
+        self.checkpoint()
+        if self.jsonl is not None:
+            self.jsonl.close()
+        if self.arrow_writer is not None:
+            self.arrow_writer.close()
+            self.arrow_file.close()
+
+
+class ExportWriter:
+    """
+    Streams analyses and their records to disk as they are produced.
+
+    Analyses go to the `analyses` files. `UseCase`, `Resource` and
+    `IndustryAnalysis` objects, whether passed to `write_record` or found in
+    an analysis, go to their own kind's files; `analyze_company` returns the
+    agents' text, so analyses from it only produce `analyses` files.
+    Each record kind gets its own files in `directory`: `<kind>.jsonl`, an
+    Arrow IPC stream `<kind>.arrows`, and Parquet parts under `<kind>/`.
+    JSONL lines are written immediately; columnar rows are buffered and
+    written as one batch per checkpoint, so memory stays bounded by the
+    checkpoint interval regardless of job size. After every checkpoint the
+    JSONL and Arrow files can be read up to that point and every published
+    Parquet part is complete. Existing files of the same name are replaced.
+    """
+
+    def __init__(self, directory: str, formats: Sequence[str] = ("jsonl",),
+                 checkpoint_every: int = EXPORT_CHECKPOINT_EVERY, fsync: bool = EXPORT_FSYNC):
+        """
+        Args:
+            directory: Output directory, created if missing
+            formats: Any of "jsonl", "arrow" and "parquet"
+            checkpoint_every: Records written between automatic checkpoints
+            fsync: Also force checkpointed data to stable storage
+
+        Raises:
+            ValueError: If a format is unknown
+            ImportError: If "arrow" or "parquet" is requested without pyarrow installed
+        """
+        self.formats = set(formats)
+        unknown = self.formats - set(FORMATS)
+        if unknown:
+            raise ValueError(f"Unknown export formats: {sorted(unknown)}")
+        if self.formats & {"arrow", "parquet"}:
+            _pyarrow()
+        self.directory = directory
+        self.checkpoint_every = checkpoint_every
+        self.fsync = fsync
+        self.written = 0
+        self._sinks: Dict[str, _Sink] = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def __enter__(self) -> "ExportWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _sink(self, kind: str) -> _Sink:
+        sink = self._sinks.get(kind)
+        if sink is None:
+            sink = self._sinks[kind] = _Sink(self.directory, kind, self.formats, self.fsync)
+        return sink
+
+    def _write(self, kind: str, fields: Dict[str, Any], company: Optional[str], industry: Optional[str]) -> None:
+        row = {"company": company, "industry": industry, "exported_at": datetime.now(timezone.utc)}
+        row.update({name: _plain(value) for name, value in fields.items()})
+        self._sink(kind).write(row)
+        self.written += 1
+        if self.checkpoint_every and self.written % self.checkpoint_every == 0:
+            self.checkpoint()
+
+    def write_record(self, record: BaseModel, company: Optional[str] = None, industry: Optional[str] = None) -> None:
+        """
+        Write a UseCase, Resource or IndustryAnalysis.
+
+        Raises:
+            TypeError: If the record is not one of the exported models
+        """
+        kind = RECORD_KINDS.get(type(record))
+        if kind is None:
+            raise TypeError(f"Cannot export {type(record).__name__} records")
+        self._write(kind, {name: getattr(record, name) for name in type(record).model_fields}, company, industry)
+
+    def write_analysis(self, company: str, industry: str, result: Optional[Dict[str, Any]] = None,
+                       error: Optional[str] = None) -> None:
+        """
+        Write one `analyze_company` result, or the reason it has none.
+
+        Any UseCase, Resource or IndustryAnalysis objects in the result are
+        also written to their own record files. Values other than text are
+        stored as JSON, and failed agent steps listed under the result's
+        "errors" entry fill `error` when none is given.
+        """
+        result = result or {}
+        if error is None and result.get("errors"):
+            error = json.dumps(result["errors"])
+        fields = {"error": error}
+        for name in ANALYSIS_FIELDS:
+            value = result.get(name)
+            records = value if isinstance(value, list) else [value]
+            if value is not None and all(isinstance(item, BaseModel) for item in records):
+                for record in records:
+                    self.write_record(record, company, industry)
+                value = json.dumps([record.model_dump(mode="json") for record in records])
+            elif value is not None and not isinstance(value, str):
+                value = json.dumps(value, default=_json_default)
+            fields[name] = value
+        self._write(ANALYSIS_KIND, fields, company, industry)
+
+    def checkpoint(self) -> None:
+        """Flush every open file so readers see all records written so far."""
+        for sink in self._sinks.values():
+            sink.checkpoint()
+
+    def close(self) -> None:
+        """Checkpoint and close every file, re-raising the first failure once all are closed."""
+        failure = None
+        for sink in self._sinks.values():
+            try:
+                sink.close()
+            except Exception as e:
+                logger.error("Closing %s export failed: %s", sink.kind, e)
+                failure = failure or e
+        self._sinks.clear()
+        if failure is not None:
+            raise failure
+
+
+def export_batch(system, requests: Iterable[Tuple[str, str]], directory: str,
+                 formats: Sequence[str] = ("jsonl",), max_concurrency: int = 1,
+                 checkpoint_every: int = EXPORT_CHECKPOINT_EVERY,
+                 priority: Priority = Priority.BATCH, tenant: str = "default",
+                 timeout: Optional[float] = None) -> Dict[str, int]:
+    """
+    Analyze many companies and stream every result to an export.
+
+    Results are written as soon as each analysis finishes and then dropped,
+    and at most `max_concurrency` analyses are pending at a time, so memory
+    does not grow with the number of requests. Failed analyses are exported
+    with their error instead of stopping the job.
+
+    Args:
+        system: MarketResearchSystem or WorkerPool to run the analyses on
+        requests: (company_name, industry) pairs; may be a lazy iterator
+        directory: Export directory
+        formats: Any of "jsonl", "arrow" and "parquet"
+        max_concurrency: Analyses submitted at once
+        checkpoint_every: Records written between checkpoints
+        priority: Scheduling class of the analyses
+        tenant: Owner charged for the tokens used
+        timeout: Deadline in seconds per analysis (defaults to ANALYSIS_TIMEOUT)
+
+    Returns:
+        Counts of exported and failed analyses
+    """
+    counts = {"exported": 0, "failed": 0}
+
+    def analyze(company: str, industry: str) -> Dict:
+        return system.analyze_company(
+            company, industry, cancel_token=CancelToken(), timeout=timeout, priority=priority, tenant=tenant
+        )
+
+    def collect(future: Future, company: str, industry: str) -> None:
+        try:
+            writer.write_analysis(company, industry, future.result())
+            counts["exported"] += 1
+        except Exception as e:
+            logger.warning("Analysis of %s (%s) failed during export: %s", company, industry, e)
+            writer.write_analysis(company, industry, error=f"{type(e).__name__}: {e}")
+            counts["failed"] += 1
+
+    with ExportWriter(directory, formats, checkpoint_every) as writer, \
+            ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="export") as executor:
+        pending: Dict[Future, Tuple[str, str]] = {}
+        for company, industry in requests:
+            if len(pending) >= max_concurrency:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    collect(future, *pending.pop(future))
+            pending[executor.submit(analyze, company, industry)] = (company, industry)
+        for future in list(pending):
+            collect(future, *pending.pop(future))
+    logger.info("Exported %d analyses to %s (%d failed)", counts["exported"], directory, counts["failed"])
+    return counts
@@ -0,0 +1,173 @@
+"""Disk-backed cache for individual chat model calls."""
+
+import hashlib
+import json
+import threading
+import warnings
+from collections import defaultdict
+from typing import Any, Dict, Optional
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps, loads
+
+from ..config.constants import (
+    DEFAULT_TEMPERATURE,
+    LLM_CACHE_MAX_ENTRIES,
+    CACHE_MODE,
+    LLM_CACHE_SAMPLED
+)
+from .store import LocalStore, default_store
+
+warnings.filterwarnings("ignore", message="The function `loads` is in beta")
+
+# Message fields that differ between otherwise identical calls
+_VOLATILE_KEYS = {"id", "tool_call_id", "response_metadata", "usage_metadata"}
+# Model settings that affect the completion; everything else (timeouts, keys) is ignored
+_MODEL_KEYS = ("model_name", "model", "temperature", "max_tokens", "top_p")
+
+
+class CacheMissError(RuntimeError):
+    """Raised in replay mode when a model call has no cached response."""
+
+
+def _digest(*parts: str) -> str:
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def _normalize(value: Any) -> Any:
+    """Drop volatile fields and collapse whitespace in a serialized message payload."""
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items() if k not in _VOLATILE_KEYS}
+    if isinstance(value, list):
+        return [_normalize(v) for v in value]
+    if isinstance(value, str):
+        return " ".join(value.split())
+    return value
+
+
+def normalized_key(prompt: str, llm_string: str) -> str:
+    """
+    Build the normalized cache key for a model call.
+
+    Args:
+        prompt: Serialized messages, as passed to `BaseCache.lookup`
+        llm_string: Serialized model settings and bound tools
+
+    Returns:
+        Hex digest over the model, sampling settings, messages and tool payload
+    """
+    model_part, _, params_part = llm_string.partition("---")
+    try:
+        kwargs = json.loads(model_part).get("kwargs", {})
+        model_part = json.dumps({k: kwargs.get(k) for k in _MODEL_KEYS}, sort_keys=True)
+    except ValueError:
+        pass
+    try:
+        prompt = json.dumps(_normalize(json.loads(prompt)), sort_keys=True)
+    except ValueError:
+        prompt = " ".join(prompt.split())
+    return _digest("normalized", model_part, params_part, prompt)
+
+
+class LLMCache(BaseCache):
+    """
+    Model-call cache keyed by an exact and a normalized prompt digest.
+
+    Lookups try the exact key first, then the normalized one, so calls that
+    differ only in message ids or whitespace still hit. Entries live in the
+    local store, are shared by every process, and are evicted least recently
+    used first once the store holds more than `max_entries`.
+
+    Each agent gets its own instance so hit rates are reported per agent.
+    """
+
+    def __init__(self, agent_name: str, store: Optional[LocalStore] = None,
+                 max_entries: int = LLM_CACHE_MAX_ENTRIES, replay: bool = False):
+        """
+        Args:
+            agent_name: Agent the hit/miss counters are attributed to
+            store: Shared store holding the entries (defaults to the process-wide store)
+            max_entries: Entry count above which least recently used entries are evicted
+            replay: Raise CacheMissError on a miss instead of letting the call reach the network
+        """
+        self.agent_name = agent_name
+        self.max_entries = max_entries
+        self.replay = replay
+        self._store = store
+        self._writes = 0
+
+    @property
+    def store(self) -> LocalStore:
+        if self._store is None:
+            self._store = default_store()
+        return self._store
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        """Return cached generations for the call, or None on a miss."""
+        payload = self.store.get_llm(_digest("exact", llm_string, prompt))
+        if payload is None:
+            payload = self.store.get_llm(normalized_key(prompt, llm_string))
+        if payload is None:
+            _record(self.agent_name, hit=False)
+            if self.replay:
+                raise CacheMissError(f"No cached response for {self.agent_name} agent call in replay mode")
+            return None
+        _record(self.agent_name, hit=True)
+        return [loads(generation) for generation in json.loads(payload)]
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        """Store generations under both the exact and the normalized key."""
+        payload = json.dumps([dumps(generation) for generation in return_val])
+        self.store.put_llm(
+            [_digest("exact", llm_string, prompt), normalized_key(prompt, llm_string)],
+            payload
+        )
+        self._writes += 1
+        if self._writes % 100 == 0:
+            self.store.evict_llm(self.max_entries)
+
+    def clear(self, **kwargs: Any) -> None:
+        """Remove every cached model response."""
+        self.store.evict_llm(0)
+
+
+_stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {"hits": 0, "misses": 0})
+_stats_lock = threading.Lock()
+
+
+def _record(agent_name: str, hit: bool) -> None:
+    with _stats_lock:
+        _stats[agent_name]["hits" if hit else "misses"] += 1
+
+
+def llm_cache_stats() -> Dict[str, Dict[str, float]]:
+    """Return hits, misses and hit rate per agent for this process."""
+    with _stats_lock:
+        report = {}
+        for agent_name, counts in _stats.items():
+            total = counts["hits"] + counts["misses"]
+            report[agent_name] = {**counts, "hit_rate": counts["hits"] / total if total else 0.0}
+        return report
+
+
+def build_llm_cache(agent_name: str, temperature: float = DEFAULT_TEMPERATURE) -> Optional[LLMCache]:
+    """
+    Create the model-call cache for an agent according to CACHE_MODE.
+
+    Sampled calls (temperature > 0) are not cached unless LLM_CACHE_SAMPLED is
+    set, since callers expect varied output. Replay mode always caches.
+
+    Args:
+        agent_name: Agent the cache is attached to
+        temperature: Sampling temperature of the agent's model
+
+    Returns:
+        The cache, or None when caching is off for this agent
+    """
+    if CACHE_MODE == "off":
+        return None
+    if CACHE_MODE == "replay":
+        return LLMCache(agent_name, replay=True)
+    if temperature > 0 and not LLM_CACHE_SAMPLED:
+        return None
+    return LLMCache(agent_name)
@@ -0,0 +1,194 @@
+"""Structured, queued logging for the agents and search utilities."""
+
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import zlib
+from contextlib import contextmanager
+from typing import Any, Iterator, List, Optional
+from uuid import uuid4
+
+from langchain_core.agents import AgentAction, AgentFinish
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from ..config.constants import LOG_FORMAT, LOG_LEVEL, LOG_MAX_PAYLOAD, LOG_QUEUE_SIZE, LOG_SAMPLE_RATE
+from .usage import token_usage
+
+_run_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("run_id", default=None)
+
+# Attributes every LogRecord has; anything else was passed through `extra`
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "run_id"}
+
+
+def current_run_id() -> Optional[str]:
+    """Return the correlation id of the run executing in this context."""
+    return _run_id.get()
+
+
+@contextmanager
+def log_context(run_id: Optional[str] = None) -> Iterator[str]:
+    """
+    Tag every log record emitted inside the block with a correlation id.
+
+    Args:
+        run_id: Id to use; a new one is generated if None
+
+    Yields:
+        The active run id
+    """
+    token = _run_id.set(run_id or uuid4().hex[:12])
+    try:
+        yield _run_id.get()
+    finally:
+        _run_id.reset(token)
+
+
+def truncate(value: Any, limit: int = LOG_MAX_PAYLOAD) -> str:
+    """Render `value` as a single line of at most `limit` characters."""
+    text = " ".join(str(value).split())
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}... [{len(text) - limit} more chars]"
+
+
+class RunIdFilter(logging.Filter):
+    """Copy the context's run id onto each record."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.run_id = _run_id.get() or "-"
+        return True
+
+
+class RunSamplingFilter(logging.Filter):
+    """
+    Keep a fraction of runs' low-level records.
+
+    The decision is made per run id, so a sampled run is logged completely.
+    Warnings and errors, and records outside any run, are always kept.
+    """
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.threshold = int(rate * 10000)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        run_id = getattr(record, "run_id", "-")
+        if record.levelno >= logging.WARNING or run_id == "-":
+            return True
+        return zlib.crc32(run_id.encode()) % 10000 < self.threshold
+
+
+class JsonFormatter(logging.Formatter):
+    """Render records as one JSON object per line, including `extra` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "run_id": getattr(record, "run_id", "-"),
+            "message": record.getMessage(),
+        }
+        entry.update({k: v for k, v in vars(record).items() if k not in _RECORD_ATTRS})
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that drops records instead of blocking when the queue is full."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_configure_lock = threading.Lock()
+
+
+def configure_logging(level: str = LOG_LEVEL, sample_rate: float = LOG_SAMPLE_RATE,
+                      fmt: str = LOG_FORMAT, queue_size: int = LOG_QUEUE_SIZE) -> None:
+    """
+    Route all logging through a bounded queue drained by a background thread.
+
+    Callers only pay for enqueueing a record; formatting and writing to
+    stderr happen off the hot path. Safe to call more than once.
+
+    Args:
+        level: Root log level name, e.g. "INFO" or "DEBUG"
+        sample_rate: Fraction of runs whose DEBUG/INFO records are kept
+        fmt: "text" or "json"
+        queue_size: Maximum buffered records before new ones are dropped
+    """
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            return
+        stream_handler = logging.StreamHandler(sys.stderr)
+        if fmt == "json":
+            stream_handler.setFormatter(JsonFormatter())
+        else:
+            stream_handler.setFormatter(
+                logging.Formatter("%(asctime)s %(levelname)s %(name)s [%(run_id)s] %(message)s")
+            )
+
+        queue_handler = DroppingQueueHandler(queue.Queue(maxsize=queue_size))
+        queue_handler.addFilter(RunIdFilter())
+        if sample_rate < 1:
+            queue_handler.addFilter(RunSamplingFilter(sample_rate))
+
+        root = logging.getLogger()
+        root.handlers = [queue_handler]
+        numeric_level = logging.getLevelName(str(level).upper())
+        known_level = isinstance(numeric_level, int)
+        if not known_level:
+            numeric_level = logging.INFO
+        # DEBUG applies to this package only; third-party libraries stay at INFO and above
+        root.setLevel(max(numeric_level, logging.INFO))
+        logging.getLogger(__name__.split(".")[0]).setLevel(numeric_level)
+        _listener = logging.handlers.QueueListener(queue_handler.queue, stream_handler)
+        _listener.start()
+        atexit.register(_listener.stop)
+        if not known_level:
+            logging.getLogger(__name__).warning("Unknown log level %r; using INFO", level)
+
+
+class AgentLogCallbackHandler(BaseCallbackHandler):
+    """Logs agent steps at DEBUG with truncated payloads, replacing verbose stdout output."""
+
+    run_inline = True
+
+    def __init__(self, agent_logger: logging.Logger):
+        self.logger = agent_logger
+
+    def on_agent_action(self, action: AgentAction, **kwargs: Any) -> None:
+        self.logger.debug("Calling %s with %s", action.tool, truncate(action.tool_input))
+
+    def on_tool_end(self, output: Any, **kwargs: Any) -> None:
+        self.logger.debug("Tool returned %s", truncate(output))
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        self.logger.debug("Model call used %s tokens", token_usage(response)["total_tokens"])
+
+    def on_agent_finish(self, finish: AgentFinish, **kwargs: Any) -> None:
+        self.logger.debug("Agent finished: %s", truncate(finish.return_values.get("output", "")))
+
+
+def agent_log_callbacks(agent_logger: logging.Logger) -> List[BaseCallbackHandler]:
+    """Return the logging callbacks for a run, or none when DEBUG is disabled."""
+    if agent_logger.isEnabledFor(logging.DEBUG):
+        return [AgentLogCallbackHandler(agent_logger)]
+    return []
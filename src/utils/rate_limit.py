@@ -0,0 +1,60 @@
+"""Rate limiting shared by every worker process through the local store."""
+
+import asyncio
+import time
+from typing import Optional
+
+from langchain_core.rate_limiters import BaseRateLimiter
+
+from ..config.constants import RATE_LIMIT_BURST, RATE_LIMIT_RPS
+from .store import LocalStore, default_store
+
+
+class SharedRateLimiter(BaseRateLimiter):
+    """
+    Token bucket kept in the local store, so the request budget is global
+    across processes rather than per interpreter.
+    """
+
+    def __init__(self, name: str = "openai", rate: float = RATE_LIMIT_RPS,
+                 burst: float = RATE_LIMIT_BURST, store: Optional[LocalStore] = None,
+                 max_wait: float = 1.0):
+        """
+        Args:
+            name: Bucket name; limiters with the same name share one budget
+            rate: Requests allowed per second across all processes
+            burst: Maximum requests allowed back to back
+            store: Shared store holding the bucket (defaults to the process-wide store)
+            max_wait: Upper bound on a single sleep while waiting for a token
+        """
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.max_wait = max_wait
+        self._store = store
+
+    @property
+    def store(self) -> LocalStore:
+        if self._store is None:
+            self._store = default_store()
+        return self._store
+
+    def acquire(self, *, blocking: bool = True) -> bool:
+        """Take one request from the shared budget, sleeping until one is available."""
+        while True:
+            wait = self.store.take_token(self.name, self.rate, self.burst)
+            if wait == 0:
+                return True
+            if not blocking:
+                return False
+            time.sleep(min(wait, self.max_wait))
+
+    async def aacquire(self, *, blocking: bool = True) -> bool:
+        """Async variant of `acquire`; the store update runs off the event loop."""
+        while True:
+            wait = await asyncio.to_thread(self.store.take_token, self.name, self.rate, self.burst)
+            if wait == 0:
+                return True
+            if not blocking:
+                return False
+            await asyncio.sleep(min(wait, self.max_wait))
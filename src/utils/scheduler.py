@@ -0,0 +1,340 @@
+"""Cost- and quota-aware admission of analyses to the agents."""
+
+import heapq
+import itertools
+import logging
+import sys
+import threading
+import time
+import weakref
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from enum import Enum
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+
+from ..config.constants import (
+    ESTIMATED_ANALYSIS_TOKENS,
+    SCHEDULER_CONCURRENCY,
+    SCHEDULER_METRICS_INTERVAL,
+    SCHEDULER_RESERVED_INTERACTIVE,
+    SCHEDULER_TOKENS_PER_MINUTE,
+    SCHEDULER_WEIGHTS,
+    TENANT_BUDGET_WINDOW,
+    TENANT_TOKEN_BUDGET
+)
+from .cancellation import AnalysisCancelled, CancelToken
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(str, Enum):
+    INTERACTIVE = "interactive"
+    BATCH = "batch"
+
+
+class BudgetExceeded(Exception):
+    """Raised when a tenant's token budget cannot cover an analysis."""
+
+
+class Ticket:
+    """A queued or admitted analysis."""
+
+    def __init__(self, priority: Priority, tenant: str, estimated_tokens: int,
+                 start_tag: float, finish_tag: float, cancel_token: Optional[CancelToken] = None):
+        self.priority = priority
+        self.cancel_token = cancel_token
+        self.tenant = tenant
+        self.estimated_tokens = estimated_tokens
+        self.start_tag = start_tag
+        self.finish_tag = finish_tag
+        self.enqueued_at = time.monotonic()
+        self.admitted_at: Optional[float] = None
+        self.abandoned = False
+        # (window, entry, window length) for each budget charged at admission
+        self.charges: List[Tuple[Deque[List[float]], List[float], float]] = []
+
+
+class Scheduler:
+    """
+    Admits analyses by priority class, fair share and estimated token cost.
+
+    Queued work is ordered by weighted fair queuing: every (priority, tenant)
+    flow advances a virtual finish tag by `estimated_tokens / weight`, and the
+    smallest tag runs next, so interactive flows get `weight`-times the share
+    of batch flows without starving them. Admission also requires a free
+    slot (batch work cannot take the slots reserved for interactive traffic)
+    and room in the rolling per-minute token budget. Each tenant has its own
+    token budget per window; requests it cannot cover are rejected outright.
+
+    Budgets are charged the estimate at admission. On release the admission
+    entry is corrected to the actual use while it is still inside its window;
+    once it has aged out, only use beyond the estimate is booked, so a window
+    never goes negative.
+    """
+
+    def __init__(self, concurrency: int = SCHEDULER_CONCURRENCY,
+                 reserved_interactive: int = SCHEDULER_RESERVED_INTERACTIVE,
+                 tokens_per_minute: int = SCHEDULER_TOKENS_PER_MINUTE,
+                 weights: Optional[Dict[str, float]] = None,
+                 tenant_budget: int = TENANT_TOKEN_BUDGET,
+                 budget_window: float = TENANT_BUDGET_WINDOW,
+                 metrics_interval: float = SCHEDULER_METRICS_INTERVAL):
+        """
+        Args:
+            concurrency: Analyses allowed to run at once
+            reserved_interactive: Slots batch work may never occupy
+            tokens_per_minute: Estimated tokens admitted per rolling minute
+            weights: Fair-share weight per priority class
+            tenant_budget: Tokens each tenant may spend per window; 0 for unlimited
+            budget_window: Length of the tenant budget window in seconds
+            metrics_interval: Seconds between `metrics()` log records while the
+                scheduler is in use; 0 disables them
+        """
+        self.concurrency = concurrency
+        self.reserved_interactive = min(reserved_interactive, concurrency - 1)
+        self.tokens_per_minute = tokens_per_minute
+        self.weights = weights or SCHEDULER_WEIGHTS
+        self.tenant_budget = tenant_budget
+        self.budget_window = budget_window
+        self.metrics_interval = metrics_interval
+        self.estimate = float(ESTIMATED_ANALYSIS_TOKENS)
+
+        self._cond = threading.Condition()
+        self._queue: List[Tuple[float, int, Ticket]] = []
+        self._seq = itertools.count()
+        self._virtual_time = 0.0
+        self._flow_finish: Dict[Tuple[Priority, str], float] = defaultdict(float)
+        self._running: Dict[Priority, int] = defaultdict(int)
+        # Budget entries are [charged_at, tokens] lists so release can correct them in place
+        self._minute: Deque[List[float]] = deque()
+        self._tenant_usage: Dict[str, Deque[List[float]]] = defaultdict(deque)
+        self._waits: Dict[Priority, Deque[float]] = defaultdict(lambda: deque(maxlen=1000))
+        self._counters: Dict[str, int] = defaultdict(int)
+        # Promotions requested before the run's ticket was queued
+        self._promoted: "weakref.WeakKeyDictionary[CancelToken, Priority]" = weakref.WeakKeyDictionary()
+        self._reporter: Optional[threading.Thread] = None
+
+    def estimate_tokens(self) -> int:
+        """Expected token cost of one analysis, learned from completed runs."""
+        return int(self.estimate)
+
+    @contextmanager
+    def slot(self, priority: Priority, tenant: str, cancel_token: CancelToken) -> Iterator[Ticket]:
+        """
+        Hold a run slot for the duration of the block.
+
+        Tokens recorded on `cancel_token` inside the block are charged to the
+        tenant and refine the cost estimate.
+        """
+        before = cancel_token.tokens_used
+        ticket = self.acquire(priority, tenant, cancel_token)
+        try:
+            yield ticket
+        finally:
+            self.release(ticket, cancel_token.tokens_used - before)
+
+    def acquire(self, priority: Priority, tenant: str, cancel_token: CancelToken) -> Ticket:
+        """
+        Queue an analysis and block until it is admitted.
+
+        Raises:
+            BudgetExceeded: If the tenant's remaining budget is below the estimate
+            AnalysisCancelled: If the token trips while queued
+        """
+        priority = Priority(priority)
+        estimated = self.estimate_tokens()
+        self._start_reporter()
+        with self._cond:
+            promoted = self._promoted.pop(cancel_token, None)
+            if promoted is not None and self.weights.get(promoted.value, 1) > self.weights.get(priority.value, 1):
+                priority = promoted
+            if self.tenant_budget and self._tenant_used(tenant) + estimated > self.tenant_budget:
+                self._counters["rejected"] += 1
+                logger.warning("Rejecting %s analysis for tenant %s: token budget exhausted", priority.value, tenant)
+                raise BudgetExceeded(f"Tenant {tenant} has exhausted its token budget")
+            flow = (priority, tenant)
+            start = max(self._virtual_time, self._flow_finish[flow])
+            finish = start + estimated / self.weights.get(priority.value, 1)
+            self._flow_finish[flow] = finish
+            ticket = Ticket(priority, tenant, estimated, start, finish, cancel_token)
+            heapq.heappush(self._queue, (finish, next(self._seq), ticket))
+            self._dispatch()
+
+            while ticket.admitted_at is None:
+                if cancel_token.cancelled:
+                    ticket.abandoned = True
+                    self._dispatch()
+                    raise AnalysisCancelled(cancel_token.reason, 0)
+                self._cond.wait(0.1)
+                self._dispatch()
+            self._waits[priority].append(ticket.admitted_at - ticket.enqueued_at)
+        return ticket
+
+    def promote(self, cancel_token: CancelToken, priority: Priority) -> bool:
+        """
+        Re-queue the still-queued run holding `cancel_token` under a higher-weighted priority.
+
+        Used when a more urgent caller attaches to a run that is waiting for
+        admission, so it does not wait in the lower class's queue.
+
+        Returns:
+            True if a queued ticket was moved
+        """
+        priority = Priority(priority)
+        weight = self.weights.get(priority.value, 1)
+        with self._cond:
+            for index, (_, _, ticket) in enumerate(self._queue):
+                if ticket.cancel_token is cancel_token and ticket.admitted_at is None and not ticket.abandoned:
+                    break
+            else:
+                # Not queued yet (or already admitted): apply it if the run queues later
+                previous = self._promoted.get(cancel_token)
+                if previous is None or weight > self.weights.get(previous.value, 1):
+                    self._promoted[cancel_token] = priority
+                return False
+            if weight <= self.weights.get(ticket.priority.value, 1):
+                return False
+            flow = (priority, ticket.tenant)
+            start = max(self._virtual_time, self._flow_finish[flow])
+            finish = start + ticket.estimated_tokens / weight
+            self._flow_finish[flow] = finish
+            logger.info("Promoting queued %s analysis to %s", ticket.priority.value, priority.value)
+            ticket.priority, ticket.start_tag, ticket.finish_tag = priority, start, finish
+            self._queue[index] = (finish, next(self._seq), ticket)
+            heapq.heapify(self._queue)
+            self._counters["promoted"] += 1
+            self._dispatch()
+        return True
+
+    def release(self, ticket: Ticket, actual_tokens: Optional[int] = None) -> None:
+        """Free the ticket's slot and charge its actual token use."""
+        with self._cond:
+            self._running[ticket.priority] -= 1
+            if actual_tokens is not None:
+                now = time.monotonic()
+                for window, entry, length in ticket.charges:
+                    if entry[0] >= now - length:
+                        entry[1] = actual_tokens
+                    elif actual_tokens > ticket.estimated_tokens:
+                        window.append([now, actual_tokens - ticket.estimated_tokens])
+                if actual_tokens > 0:
+                    self.estimate = 0.8 * self.estimate + 0.2 * actual_tokens
+            self._counters["completed"] += 1
+            self._dispatch()
+            self._cond.notify_all()
+
+    def _tenant_used(self, tenant: str) -> int:
+        usage = self._tenant_usage[tenant]
+        horizon = time.monotonic() - self.budget_window
+        while usage and usage[0][0] < horizon:
+            usage.popleft()
+        return sum(tokens for _, tokens in usage)
+
+    def _minute_used(self) -> int:
+        horizon = time.monotonic() - 60
+        while self._minute and self._minute[0][0] < horizon:
+            self._minute.popleft()
+        return sum(tokens for _, tokens in self._minute)
+
+    def _admissible(self, ticket: Ticket) -> bool:
+        running = sum(self._running.values())
+        limit = self.concurrency
+        if ticket.priority != Priority.INTERACTIVE:
+            limit -= self.reserved_interactive
+        if running >= limit:
+            return False
+        # Always let one run through so an oversized estimate cannot stall the queue
+        return running == 0 or self._minute_used() + ticket.estimated_tokens <= self.tokens_per_minute
+
+    def _dispatch(self) -> None:
+        """Admit queued tickets in finish-tag order while capacity allows. Caller holds the lock."""
+        deferred = []
+        while self._queue:
+            entry = heapq.heappop(self._queue)
+            ticket = entry[2]
+            if ticket.abandoned:
+                continue
+            if not self._admissible(ticket):
+                deferred.append(entry)
+                # A blocked interactive head should not be overtaken by batch work
+                if ticket.priority == Priority.INTERACTIVE:
+                    break
+                continue
+            now = time.monotonic()
+            ticket.admitted_at = now
+            self._virtual_time = max(self._virtual_time, ticket.start_tag)
+            self._running[ticket.priority] += 1
+            minute_entry = [now, ticket.estimated_tokens]
+            tenant_entry = [now, ticket.estimated_tokens]
+            self._minute.append(minute_entry)
+            self._tenant_usage[ticket.tenant].append(tenant_entry)
+            ticket.charges = [
+                (self._minute, minute_entry, 60),
+                (self._tenant_usage[ticket.tenant], tenant_entry, self.budget_window),
+            ]
+            self._counters["admitted"] += 1
+            self._cond.notify_all()
+        for entry in deferred:
+            heapq.heappush(self._queue, entry)
+
+    def metrics(self) -> Dict[str, float]:
+        """
+        Snapshot of queue depth, wait times and budget use.
+
+        Returns:
+            Flat dict of metric name to value, e.g. `queue_depth.interactive`
+            or `wait_seconds_p95.batch`
+        """
+        with self._cond:
+            report: Dict[str, float] = {
+                "running": sum(self._running.values()),
+                "tokens_last_minute": self._minute_used(),
+                "estimated_tokens_per_analysis": self.estimate_tokens(),
+                **{f"{name}_total": count for name, count in self._counters.items()},
+            }
+            for priority in Priority:
+                depth = sum(1 for _, _, t in self._queue if t.priority == priority and not t.abandoned)
+                waits = sorted(self._waits[priority])
+                report[f"queue_depth.{priority.value}"] = depth
+                report[f"running.{priority.value}"] = self._running[priority]
+                report[f"wait_seconds_p50.{priority.value}"] = waits[len(waits) // 2] if waits else 0.0
+                report[f"wait_seconds_p95.{priority.value}"] = waits[int(len(waits) * 0.95)] if waits else 0.0
+            return report
+
+    def _start_reporter(self) -> None:
+        """Start logging `metrics()` every `metrics_interval` seconds, once per scheduler."""
+        if self.metrics_interval <= 0 or self._reporter is not None:
+            return
+        with self._cond:
+            if self._reporter is not None:
+                return
+            self._reporter = threading.Thread(target=self._report, name="scheduler-metrics", daemon=True)
+        self._reporter.start()
+
+    def _report(self) -> None:
+        while True:
+            time.sleep(self.metrics_interval)
+            metrics = self.metrics()
+            logger.info(
+                "Scheduler metrics: %s", " ".join(f"{name}={value:g}" for name, value in sorted(metrics.items())),
+                extra={"scheduler": metrics}
+            )
+
+
+def unlimited_scheduler() -> Scheduler:
+    """Scheduler that admits every run at once, for processes whose admission is decided elsewhere."""
+    return Scheduler(concurrency=sys.maxsize, reserved_interactive=0, tokens_per_minute=sys.maxsize,
+                     tenant_budget=0, metrics_interval=0)
+
+
+_default_scheduler: Optional[Scheduler] = None
+_default_lock = threading.Lock()
+
+
+def default_scheduler() -> Scheduler:
+    """Return the process-wide scheduler, creating it on first use."""
+    global _default_scheduler
+    with _default_lock:
+        if _default_scheduler is None:
+            _default_scheduler = Scheduler()
+    return _default_scheduler
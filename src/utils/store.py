@@ -0,0 +1,301 @@
+"""Local SQLite store shared by every process on the host."""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+from ..config.constants import STORE_PATH
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS leases (
+    key TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS search_cache (
+    query TEXT PRIMARY KEY,
+    result TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rate_buckets (
+    name TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS llm_cache_last_used ON llm_cache (last_used);
+CREATE TABLE IF NOT EXISTS cancellations (
+    request_id TEXT PRIMARY KEY,
+    reason TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS run_usage (
+    request_id TEXT PRIMARY KEY,
+    tokens_used INTEGER NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS agent_runs (
+    agent TEXT NOT NULL,
+    industry TEXT NOT NULL,
+    iterations INTEGER NOT NULL,
+    completion_tokens INTEGER NOT NULL,
+    longest_completion INTEGER NOT NULL,
+    truncated INTEGER NOT NULL,
+    hit_iteration_limit INTEGER NOT NULL,
+    max_iterations INTEGER NOT NULL,
+    max_tokens INTEGER NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS agent_runs_lookup ON agent_runs (agent, industry, created_at);
+"""
+
+_default_store: Optional["LocalStore"] = None
+_default_lock = threading.Lock()
+
+
+def default_store() -> "LocalStore":
+    """Return the process-wide store at STORE_PATH, opening it on first use."""
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = LocalStore()
+    return _default_store
+
+
+class LocalStore:
+    """
+    Thin wrapper around a SQLite file used for cross-process coordination.
+
+    Each thread gets its own connection; WAL mode lets readers proceed while
+    another process holds the write lock.
+    """
+
+    def __init__(self, path: str = STORE_PATH):
+        """
+        Args:
+            path: Location of the SQLite database file
+        """
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        self.connect().executescript(SCHEMA)
+
+    def connect(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def try_acquire_lease(self, key: str, owner: str, ttl: float) -> bool:
+        """
+        Take the lease on `key` unless another owner holds an unexpired one.
+
+        Args:
+            key: Lease name
+            owner: Identifier of the caller
+            ttl: Seconds until the lease expires if not released
+
+        Returns:
+            True if the caller now holds the lease
+        """
+        now = time.time()
+        conn = self.connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT owner, expires_at FROM leases WHERE key = ?", (key,)).fetchone()
+            if row is not None and row[0] != owner and row[1] > now:
+                conn.execute("COMMIT")
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO leases (key, owner, expires_at) VALUES (?, ?, ?)",
+                (key, owner, now + ttl)
+            )
+            conn.execute("COMMIT")
+            return True
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def release_lease(self, key: str, owner: str) -> None:
+        """Drop the lease on `key` if `owner` still holds it."""
+        self.connect().execute("DELETE FROM leases WHERE key = ? AND owner = ?", (key, owner))
+
+    def put_result(self, key: str, payload: str) -> None:
+        """Publish a serialized result under `key`."""
+        self.connect().execute(
+            "INSERT OR REPLACE INTO results (key, payload, created_at) VALUES (?, ?, ?)",
+            (key, payload, time.time())
+        )
+
+    def get_result(self, key: str, max_age: float) -> Optional[str]:
+        """Return the payload stored under `key` if it is newer than `max_age` seconds."""
+        row = self.connect().execute(
+            "SELECT payload FROM results WHERE key = ? AND created_at >= ?",
+            (key, time.time() - max_age)
+        ).fetchone()
+        return row[0] if row else None
+
+    def purge_results(self, max_age: float) -> None:
+        """Delete results older than `max_age` seconds."""
+        self.connect().execute("DELETE FROM results WHERE created_at < ?", (time.time() - max_age,))
+
+    def get_search(self, query: str, max_age: float) -> Optional[str]:
+        """Return a cached search result for `query` if newer than `max_age` seconds."""
+        row = self.connect().execute(
+            "SELECT result FROM search_cache WHERE query = ? AND created_at >= ?",
+            (query, time.time() - max_age)
+        ).fetchone()
+        return row[0] if row else None
+
+    def put_search(self, query: str, result: str) -> None:
+        """Cache a search result for `query`."""
+        self.connect().execute(
+            "INSERT OR REPLACE INTO search_cache (query, result, created_at) VALUES (?, ?, ?)",
+            (query, result, time.time())
+        )
+
+    def purge_searches(self, max_age: float) -> None:
+        """Delete cached search results older than `max_age` seconds."""
+        self.connect().execute("DELETE FROM search_cache WHERE created_at < ?", (time.time() - max_age,))
+
+    def take_token(self, name: str, rate: float, burst: float) -> float:
+        """
+        Try to take one token from the shared token bucket `name`.
+
+        Args:
+            name: Bucket name
+            rate: Tokens added per second
+            burst: Bucket capacity
+
+        Returns:
+            0 if a token was taken, otherwise seconds until one is available
+        """
+        now = time.time()
+        conn = self.connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tokens, updated_at FROM rate_buckets WHERE name = ?", (name,)).fetchone()
+            tokens = burst if row is None else min(burst, row[0] + (now - row[1]) * rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / rate
+            conn.execute(
+                "INSERT OR REPLACE INTO rate_buckets (name, tokens, updated_at) VALUES (?, ?, ?)",
+                (name, tokens, now)
+            )
+            conn.execute("COMMIT")
+            return wait
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def request_cancel(self, request_id: str, reason: str) -> None:
+        """Ask whichever process is running `request_id` to stop."""
+        self.connect().execute(
+            "INSERT OR REPLACE INTO cancellations (request_id, reason, created_at) VALUES (?, ?, ?)",
+            (request_id, reason, time.time())
+        )
+
+    def cancel_reason(self, request_id: str) -> Optional[str]:
+        """Return the cancellation reason recorded for `request_id`, if any."""
+        row = self.connect().execute(
+            "SELECT reason FROM cancellations WHERE request_id = ?", (request_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def clear_cancel(self, request_id: str) -> None:
+        """Forget a cancellation request once the run has ended."""
+        self.connect().execute("DELETE FROM cancellations WHERE request_id = ?", (request_id,))
+
+    def record_usage(self, request_id: str, tokens_used: int) -> None:
+        """Record the tokens a cancelled run spent, for the process that cancelled it."""
+        self.connect().execute(
+            "INSERT OR REPLACE INTO run_usage (request_id, tokens_used, created_at) VALUES (?, ?, ?)",
+            (request_id, tokens_used, time.time())
+        )
+
+    def pop_usage(self, request_id: str, max_age: float = 3600) -> Optional[int]:
+        """Return and forget the tokens recorded for `request_id`; rows older than `max_age` are dropped."""
+        conn = self.connect()
+        row = conn.execute("SELECT tokens_used FROM run_usage WHERE request_id = ?", (request_id,)).fetchone()
+        conn.execute(
+            "DELETE FROM run_usage WHERE request_id = ? OR created_at < ?", (request_id, time.time() - max_age)
+        )
+        return row[0] if row else None
+
+    def get_llm(self, key: str) -> Optional[str]:
+        """Return the cached model response under `key`, marking it recently used."""
+        conn = self.connect()
+        row = conn.execute("SELECT payload FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        conn.execute("UPDATE llm_cache SET last_used = ? WHERE key = ?", (time.time(), key))
+        return row[0]
+
+    def put_llm(self, keys: List[str], payload: str) -> None:
+        """Cache a serialized model response under each of `keys`."""
+        now = time.time()
+        self.connect().executemany(
+            "INSERT OR REPLACE INTO llm_cache (key, payload, last_used) VALUES (?, ?, ?)",
+            [(key, payload, now) for key in keys]
+        )
+
+    def record_agent_run(self, agent: str, industry: str, iterations: int, completion_tokens: int,
+                         longest_completion: int, truncated: bool, hit_iteration_limit: bool,
+                         max_iterations: int, max_tokens: int) -> None:
+        """Append one agent run's telemetry, with the limits it ran under."""
+        self.connect().execute(
+            "INSERT INTO agent_runs (agent, industry, iterations, completion_tokens, longest_completion, "
+            "truncated, hit_iteration_limit, max_iterations, max_tokens, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (agent, industry, iterations, completion_tokens, longest_completion,
+             int(truncated), int(hit_iteration_limit), max_iterations, max_tokens, time.time())
+        )
+
+    def agent_runs(self, agent: str, industry: Optional[str] = None, limit: int = 200) -> List[Dict]:
+        """
+        Return the most recent runs of `agent`, newest first.
+
+        Args:
+            agent: Agent name
+            industry: Only runs for this industry; all industries if None
+            limit: Maximum number of runs returned
+        """
+        query = "SELECT * FROM agent_runs WHERE agent = ?"
+        params: list = [agent]
+        if industry is not None:
+            query += " AND industry = ?"
+            params.append(industry)
+        cursor = self.connect().execute(query + " ORDER BY created_at DESC LIMIT ?", (*params, limit))
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def purge_agent_runs(self, max_age: float) -> None:
+        """Delete agent run telemetry older than `max_age` seconds."""
+        self.connect().execute("DELETE FROM agent_runs WHERE created_at < ?", (time.time() - max_age,))
+
+    def evict_llm(self, max_entries: int) -> None:
+        """Delete least recently used model responses beyond `max_entries`."""
+        self.connect().execute(
+            "DELETE FROM llm_cache WHERE key NOT IN "
+            "(SELECT key FROM llm_cache ORDER BY last_used DESC LIMIT ?)",
+            (max_entries,)
+        )
@@ -0,0 +1,35 @@
+"""Token usage reported by model calls."""
+
+from typing import Dict
+
+from langchain_core.outputs import LLMResult
+
+
+def token_usage(response: LLMResult) -> Dict[str, int]:
+    """
+    Return the prompt, completion and total tokens of a model call.
+
+    Streamed calls report usage on each message rather than in `llm_output`,
+    so message usage is read first and `llm_output` is the fallback.
+
+    Args:
+        response: Result passed to `on_llm_end`
+
+    Returns:
+        Dict with "prompt_tokens", "completion_tokens" and "total_tokens"
+    """
+    usage = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+    found = False
+    for generations in response.generations:
+        for generation in generations:
+            metadata = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if metadata:
+                found = True
+                usage["prompt_tokens"] += metadata.get("input_tokens", 0)
+                usage["completion_tokens"] += metadata.get("output_tokens", 0)
+                usage["total_tokens"] += metadata.get("total_tokens", 0)
+    if not found:
+        reported = (response.llm_output or {}).get("token_usage") or {}
+        for key in usage:
+            usage[key] = reported.get(key) or 0
+    return usage
@@ -1,13 +1,72 @@
-from typing import List, Dict
+import logging
+from typing import List, Dict, Optional
+
+import requests
 from langchain_community.utilities import DuckDuckGoSearchAPIWrapper
 
+from ..config.constants import CACHE_MODE, SEARCH_CACHE_TTL, SEARCH_TIMEOUT, SEARCH_URL
+from .store import LocalStore, default_store
+
+logger = logging.getLogger(__name__)
+
+
+class HttpSearch:
+    """Search backend that queries an HTTP endpoint returning plain-text results."""
+    
+    def __init__(self, url: str, timeout: float = SEARCH_TIMEOUT):
+        self.url = url
+        self.timeout = timeout
+        self.session = requests.Session()
+    
+    def run(self, query: str) -> str:
+        response = self.session.get(self.url, params={"q": query}, timeout=self.timeout)
+        response.raise_for_status()
+        return response.text
+
 
 class WebSearchTool:
     """Enhanced web search utility with result processing."""
     
-    def __init__(self):
-        """Initialize the search wrapper."""
-        self.search = DuckDuckGoSearchAPIWrapper()
+    def __init__(self, store: Optional[LocalStore] = None, cache_ttl: float = SEARCH_CACHE_TTL,
+                 search_url: Optional[str] = SEARCH_URL):
+        """
+        Initialize the search wrapper.
+        
+        Args:
+            store: Shared store used to cache results across processes (defaults to the process-wide store)
+            cache_ttl: Seconds a cached result is reused; 0 disables caching
+            search_url: HTTP search endpoint to use instead of DuckDuckGo
+        """
+        self.search = HttpSearch(search_url) if search_url else DuckDuckGoSearchAPIWrapper()
+        self.source = search_url or 'DuckDuckGo'
+        self.cache_ttl = cache_ttl
+        self._store = store
+        self._writes = 0
+    
+    @property
+    def store(self) -> LocalStore:
+        if self._store is None:
+            self._store = default_store()
+        return self._store
+    
+    def _cached_search(self, query: str) -> str:
+        """Run the search, reusing a result cached by any worker process."""
+        replay = CACHE_MODE == "replay"
+        if not replay and (CACHE_MODE == "off" or self.cache_ttl <= 0):
+            return self.search.run(query)
+        key = " ".join(query.lower().split())
+        cached = self.store.get_search(key, float("inf") if replay else self.cache_ttl)
+        if cached is not None:
+            logger.debug("Search cache hit for %s", query)
+            return cached
+        if replay:
+            raise LookupError(f"No cached search result for '{query}' in replay mode")
+        result = self.search.run(query)
+        self.store.put_search(key, result)
+        self._writes += 1
+        if self._writes % 100 == 0:
+            self.store.purge_searches(self.cache_ttl)
+        return result
     
     def search_with_metadata(self, query: str, num_results: int = 5) -> List[Dict]:
         """
@@ -21,7 +80,7 @@ class WebSearchTool:
             List of dictionaries containing search results with metadata
         """
         try:
-            raw_results = self.search.run(query)
+            raw_results = self._cached_search(query)
             
             # Process and structure the results
             processed_results = []
@@ -30,12 +89,12 @@ class WebSearchTool:
                     processed_results.append({
                         'content': result.strip(),
                         'query': query,
-                        'source': 'DuckDuckGo'
+                        'source': self.source
                     })
             
             return processed_results
         except Exception as e:
-            print(f"Error in web search: {e}")
+            logger.error("Error in web search: %s", e)
             return []
     
     def run(self, query: str) -> str:
@@ -49,7 +108,7 @@ class WebSearchTool:
             Search results as a string
         """
         try:
-            return self.search.run(query)
+            return self._cached_search(query)
         except Exception as e:
-            print(f"Error in web search: {e}")
+            logger.error("Error in web search: %s", e)
             return f"Error performing web search: {str(e)}" 
\ No newline at end of file
@@ -0,0 +1,154 @@
+"""Tests for the analysis scheduler's queuing order, reservation, promotion and budget accounting."""
+
+import threading
+import time
+import types
+
+import pytest
+
+from src.utils import scheduler as scheduler_module
+from src.utils.cancellation import CancelToken
+from src.utils.scheduler import Priority, Scheduler
+
+ESTIMATE = 12000
+
+
+def make_scheduler(**kwargs) -> Scheduler:
+    options = dict(concurrency=1, reserved_interactive=0, tokens_per_minute=10 ** 9,
+                   tenant_budget=0, metrics_interval=0)
+    options.update(kwargs)
+    scheduler = Scheduler(**options)
+    scheduler.estimate = float(ESTIMATE)
+    return scheduler
+
+
+def queued(scheduler: Scheduler) -> int:
+    metrics = scheduler.metrics()
+    return sum(int(metrics[f"queue_depth.{priority.value}"]) for priority in Priority)
+
+
+def enqueue(scheduler: Scheduler, name: str, priority: Priority, order: list,
+            token: CancelToken = None) -> threading.Thread:
+    """Queue an analysis on a thread that records its admission and releases at once."""
+    depth = queued(scheduler)
+
+    def run():
+        ticket = scheduler.acquire(priority, "tenant", token or CancelToken())
+        order.append(name)
+        scheduler.release(ticket)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 2
+    while queued(scheduler) == depth and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return thread
+
+
+def drain(scheduler: Scheduler, holder, threads) -> None:
+    scheduler.release(holder)
+    for thread in threads:
+        thread.join(timeout=5)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replace the scheduler's monotonic clock with one the test advances."""
+    now = [1000.0]
+    monkeypatch.setattr(scheduler_module, "time", types.SimpleNamespace(monotonic=lambda: now[0], sleep=time.sleep))
+    return now
+
+
+def test_weighted_fair_queuing_favours_interactive_without_starving_batch():
+    scheduler = make_scheduler()
+    # Held by another flow, so the queued flows start from the same virtual time
+    holder = scheduler.acquire(Priority.BATCH, "holder", CancelToken())
+    order = []
+    threads = [enqueue(scheduler, "b1", Priority.BATCH, order), enqueue(scheduler, "b2", Priority.BATCH, order)]
+    threads += [enqueue(scheduler, f"i{n}", Priority.INTERACTIVE, order) for n in range(1, 6)]
+    drain(scheduler, holder, threads)
+    # Interactive finish tags advance by a quarter of batch ones; b1 ties with i4 and was queued first
+    assert order == ["i1", "i2", "i3", "b1", "i4", "i5", "b2"]
+
+
+def test_batch_work_cannot_take_reserved_interactive_slot():
+    scheduler = make_scheduler(concurrency=2, reserved_interactive=1)
+    batch = scheduler.acquire(Priority.BATCH, "tenant", CancelToken())
+    order = []
+    waiting = enqueue(scheduler, "b2", Priority.BATCH, order)
+    interactive = scheduler.acquire(Priority.INTERACTIVE, "tenant", CancelToken())
+    assert interactive.admitted_at is not None
+    assert order == []
+    scheduler.release(interactive)
+    assert order == []
+    drain(scheduler, batch, [waiting])
+    assert order == ["b2"]
+
+
+def test_promote_moves_queued_run_ahead_of_its_former_class():
+    scheduler = make_scheduler()
+    holder = scheduler.acquire(Priority.BATCH, "tenant", CancelToken())
+    order = []
+    token = CancelToken()
+    threads = [enqueue(scheduler, "first", Priority.BATCH, order),
+               enqueue(scheduler, "promoted", Priority.BATCH, order, token)]
+    assert scheduler.promote(token, Priority.INTERACTIVE)
+    # Promoting to the same or a lower class is a no-op
+    assert not scheduler.promote(token, Priority.BATCH)
+    drain(scheduler, holder, threads)
+    assert order == ["promoted", "first"]
+    assert scheduler.metrics()["promoted_total"] == 1
+
+
+def test_promote_before_queuing_applies_on_acquire():
+    scheduler = make_scheduler()
+    token = CancelToken()
+    assert not scheduler.promote(token, Priority.INTERACTIVE)
+    ticket = scheduler.acquire(Priority.BATCH, "tenant", token)
+    assert ticket.priority == Priority.INTERACTIVE
+
+
+def test_release_corrects_admission_charge_inside_window(clock):
+    scheduler = make_scheduler(tenant_budget=10 ** 9)
+    ticket = scheduler.acquire(Priority.BATCH, "tenant", CancelToken())
+    assert scheduler.metrics()["tokens_last_minute"] == ESTIMATE
+    clock[0] += 30
+    scheduler.release(ticket, 2000)
+    assert scheduler.metrics()["tokens_last_minute"] == 2000
+    assert scheduler._tenant_used("tenant") == 2000
+
+
+def test_release_after_window_never_goes_negative(clock):
+    scheduler = make_scheduler(tenant_budget=10 ** 9, budget_window=100)
+    ticket = scheduler.acquire(Priority.BATCH, "tenant", CancelToken())
+    clock[0] += 120
+    scheduler.release(ticket, 2000)
+    assert scheduler.metrics()["tokens_last_minute"] == 0
+    assert scheduler._tenant_used("tenant") == 0
+
+
+def test_release_after_window_books_overrun(clock):
+    scheduler = make_scheduler()
+    ticket = scheduler.acquire(Priority.BATCH, "tenant", CancelToken())
+    clock[0] += 120
+    scheduler.release(ticket, ESTIMATE + 5000)
+    assert scheduler.metrics()["tokens_last_minute"] == 5000
+
+
+def test_tenant_over_budget_is_rejected():
+    scheduler = make_scheduler(tenant_budget=ESTIMATE * 2)
+    scheduler.release(scheduler.acquire(Priority.BATCH, "tenant", CancelToken()), ESTIMATE * 2)
+    with pytest.raises(scheduler_module.BudgetExceeded):
+        scheduler.acquire(Priority.BATCH, "tenant", CancelToken())
+    # Other tenants keep their own budget
+    scheduler.acquire(Priority.BATCH, "other", CancelToken())
+
+
+def test_metrics_are_logged_periodically(caplog):
+    scheduler = make_scheduler(metrics_interval=0.05)
+    with caplog.at_level("INFO", logger=scheduler_module.__name__):
+        scheduler.release(scheduler.acquire(Priority.INTERACTIVE, "tenant", CancelToken()))
+        time.sleep(0.2)
+    records = [record for record in caplog.records if record.getMessage().startswith("Scheduler metrics")]
+    assert records
+    assert "queue_depth.interactive" in records[-1].scheduler